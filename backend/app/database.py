@@ -1,13 +1,30 @@
+import os
+import time
+import uuid
+
+from sqlalchemy import text
 from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
 from sqlalchemy.orm import DeclarativeBase
 from app.config import settings
 
+# Keep prepared statements per pooled connection: the SQLAlchemy asyncpg
+# dialect cache plus asyncpg's own cache for raw-connection queries.
+# PgBouncer in transaction mode cannot track server-side prepared
+# statements, so both caches are disabled behind it.
+_stmt_cache = 0 if settings.DB_BEHIND_PGBOUNCER else 1024
+
 engine = create_async_engine(
     settings.DATABASE_URL,
     echo=False,
     pool_pre_ping=True,
-    pool_size=10,
-    max_overflow=20,
+    pool_size=settings.DB_POOL_SIZE or max((os.cpu_count() or 1) * 2, 20),
+    max_overflow=settings.DB_MAX_OVERFLOW,
+    pool_timeout=settings.DB_POOL_TIMEOUT,
+    pool_recycle=1800,
+    connect_args={
+        "prepared_statement_cache_size": _stmt_cache,
+        "statement_cache_size": _stmt_cache,
+    },
 )
 
 AsyncSessionLocal = async_sessionmaker(
@@ -21,6 +38,24 @@ class Base(DeclarativeBase):
     pass
 
 
+def uuid7() -> uuid.UUID:
+    """
+    Time-ordered UUID (RFC 9562 version 7): 48-bit Unix ms timestamp
+    followed by random bits, so consecutive inserts land on the same
+    btree leaf instead of scattering like uuid4.
+    """
+    ts_ms = time.time_ns() // 1_000_000
+    rand = int.from_bytes(os.urandom(10), "big")
+    value = (
+        (ts_ms & 0xFFFF_FFFF_FFFF) << 80
+        | 0x7 << 76                       # version
+        | (rand >> 62 & 0xFFF) << 64      # rand_a
+        | 0b10 << 62                      # RFC 4122 variant
+        | rand & 0x3FFF_FFFF_FFFF_FFFF    # rand_b
+    )
+    return uuid.UUID(int=value)
+
+
 async def get_db() -> AsyncSession:
     async with AsyncSessionLocal() as session:
         try:
@@ -37,21 +72,97 @@ async def init_db():
     from app.models import patient, vcf_upload, detected_variant  # noqa
     from app.models import pgx_genotype_call, inhibitor_registry  # noqa
     from app.models import risk_analysis, llm_explanation, analysis_request  # noqa
+    from app.models import explanation_cache  # noqa
 
     async with engine.begin() as conn:
         await conn.run_sync(Base.metadata.create_all)
+        for ddl in _SCHEMA_UPGRADES:
+            await conn.execute(text(ddl))
 
     await seed_inhibitor_registry()
 
 
-async def seed_inhibitor_registry():
-    """Seed the inhibitor/inducer registry if empty."""
-    from app.models.inhibitor_registry import InhibitorInducerRegistry
-    from sqlalchemy import select
-    import uuid
-    from datetime import datetime, timezone
+def _jsonb_to_bytea(table: str, column: str) -> str:
+    """
+    Retype a column that older versions stored as JSONB. Old values are
+    dropped (NULL), since they are not in the packed format; the guard
+    keeps this a no-op once the column is bytea.
+    """
+    return f"""
+        DO $$
+        BEGIN
+            IF EXISTS (
+                SELECT 1 FROM information_schema.columns
+                WHERE table_schema = current_schema() AND table_name = '{table}'
+                  AND column_name = '{column}' AND data_type = 'jsonb'
+            ) THEN
+                ALTER TABLE {table} ALTER COLUMN {column} TYPE bytea USING NULL;
+            END IF;
+        END $$
+    """
 
-    SEED_DATA = [
+
+# create_all only creates missing tables; these idempotent statements bring
+# tables created by older versions up to the current models.
+_SCHEMA_UPGRADES = (
+    # seed_inhibitor_registry's ON CONFLICT target
+    "CREATE UNIQUE INDEX IF NOT EXISTS uq_iir_drug_gene_type "
+    "ON inhibitor_inducer_registry (drug_name, gene, interaction_type)",
+    # Timestamps are filled in server-side (CreatedAtMixin / TimestampMixin)
+    *(
+        f"ALTER TABLE {table} ALTER COLUMN created_at SET DEFAULT now()"
+        for table in (
+            "patients", "vcf_uploads", "detected_variants", "pgx_genotype_calls",
+            "inhibitor_inducer_registry", "risk_analyses", "llm_explanations",
+            "analysis_requests",
+        )
+    ),
+    *(
+        f"ALTER TABLE {table} ALTER COLUMN updated_at SET DEFAULT now()"
+        for table in ("patients", "vcf_uploads", "risk_analyses")
+    ),
+    # FK / lookup indexes used by the pipeline and /results queries
+    "CREATE INDEX IF NOT EXISTS ix_detected_variants_patient_id ON detected_variants (patient_id)",
+    # ix_dv_upload_gene now covers the /results projection; replace an
+    # older key-only copy
+    """
+        DO $$
+        BEGIN
+            IF EXISTS (
+                SELECT 1 FROM pg_index i JOIN pg_class c ON c.oid = i.indexrelid
+                WHERE c.relname = 'ix_dv_upload_gene' AND i.indnatts = i.indnkeyatts
+            ) THEN
+                DROP INDEX ix_dv_upload_gene;
+            END IF;
+        END $$
+    """,
+    "CREATE INDEX IF NOT EXISTS ix_dv_upload_gene ON detected_variants (vcf_upload_id, gene) "
+    "INCLUDE (rsid, position, ref_allele, alt_allele, genotype, star_allele, filter_status)",
+    "CREATE INDEX IF NOT EXISTS ix_pgx_genotype_calls_vcf_upload_id ON pgx_genotype_calls (vcf_upload_id)",
+    "CREATE INDEX IF NOT EXISTS ix_pgx_genotype_calls_patient_id ON pgx_genotype_calls (patient_id)",
+    "CREATE INDEX IF NOT EXISTS ix_ra_patient_drug ON risk_analyses (patient_id, drug_name)",
+    "CREATE INDEX IF NOT EXISTS ix_ra_vcf_patient ON risk_analyses (vcf_upload_id, patient_id)",
+    "CREATE INDEX IF NOT EXISTS ix_llm_explanations_risk_analysis_id "
+    "ON llm_explanations (risk_analysis_id)",
+    "CREATE INDEX IF NOT EXISTS ix_analysis_requests_vcf_upload_id ON analysis_requests (vcf_upload_id)",
+    # Duplicate-upload short-circuit in /upload
+    "ALTER TABLE vcf_uploads ADD COLUMN IF NOT EXISTS content_sha256 VARCHAR(64)",
+    "CREATE INDEX IF NOT EXISTS ix_vcf_patient_sha256 ON vcf_uploads (patient_id, content_sha256)",
+    # Latest completed request per patient
+    "CREATE INDEX IF NOT EXISTS ix_ar_patient_status_created "
+    "ON analysis_requests (patient_id, status, created_at)",
+    # Compressed RAG context (pack_context_chunks)
+    _jsonb_to_bytea("llm_explanations", "retrieved_context_chunks"),
+    # Compressed PyPGx output (pack_raw_output)
+    _jsonb_to_bytea("pgx_genotype_calls", "raw_pypgx_output"),
+)
+
+
+# id comes from the column's Python default, created_at from the server.
+_SEED_ROWS = [
+    {"drug_name": drug, "gene": gene, "interaction_type": itype,
+     "strength": strength, "inhibition_factor": factor, "source": source}
+    for drug, gene, itype, strength, factor, source in (
         ("PAROXETINE",  "CYP2D6",  "inhibitor", "strong",   0.0,  "FDA"),
         ("FLUOXETINE",  "CYP2D6",  "inhibitor", "strong",   0.0,  "FDA"),
         ("BUPROPION",   "CYP2D6",  "inhibitor", "strong",   0.0,  "FDA"),
@@ -63,24 +174,19 @@ async def seed_inhibitor_registry():
         ("FLUCONAZOLE", "CYP2C9",  "inhibitor", "strong",   0.0,  "FDA"),
         ("AMIODARONE",  "CYP2C9",  "inhibitor", "moderate", 0.5,  "FDA"),
         ("RIFAMPIN",    "CYP2C9",  "inducer",   "strong",   2.0,  "FDA"),
-    ]
+    )
+]
+
+
+async def seed_inhibitor_registry():
+    """Seed the inhibitor/inducer registry; existing rows are left untouched."""
+    from app.models.inhibitor_registry import InhibitorInducerRegistry
+    from sqlalchemy.dialects.postgresql import insert as pg_insert
+
+    stmt = pg_insert(InhibitorInducerRegistry).values(_SEED_ROWS).on_conflict_do_nothing(
+        index_elements=["drug_name", "gene", "interaction_type"],
+    )
 
     async with AsyncSessionLocal() as session:
-        result = await session.execute(select(InhibitorInducerRegistry).limit(1))
-        if result.scalars().first() is not None:
-            return  # already seeded
-
-        now = datetime.now(timezone.utc)
-        for drug, gene, itype, strength, factor, source in SEED_DATA:
-            entry = InhibitorInducerRegistry(
-                id=uuid.uuid4(),
-                drug_name=drug,
-                gene=gene,
-                interaction_type=itype,
-                strength=strength,
-                inhibition_factor=factor,
-                source=source,
-                created_at=now,
-            )
-            session.add(entry)
+        await session.execute(stmt)
         await session.commit()
@@ -1,25 +1,33 @@
+from __future__ import annotations
 import uuid
-from datetime import datetime, timezone
-from sqlalchemy import String, Text, DateTime, ForeignKey
+from datetime import datetime
+from typing import TYPE_CHECKING
+from sqlalchemy import String, Text, DateTime, ForeignKey, Index
 from sqlalchemy.dialects.postgresql import ARRAY
-from sqlalchemy.orm import Mapped, mapped_column
-from app.database import Base
+from sqlalchemy.orm import Mapped, mapped_column, relationship
+from app.database import Base, uuid7
+from app.models._mixins import CreatedAtMixin
 
+if TYPE_CHECKING:
+    from app.models.vcf_upload import VCFUpload
 
-def utcnow():
-    return datetime.now(timezone.utc)
 
-
-class AnalysisRequest(Base):
+class AnalysisRequest(Base, CreatedAtMixin):
     __tablename__ = "analysis_requests"
+    __table_args__ = (
+        # Latest request per patient/status (btree serves created_at DESC by backward scan)
+        Index("ix_ar_patient_status_created", "patient_id", "status", "created_at"),
+    )
 
-    id: Mapped[uuid.UUID] = mapped_column(primary_key=True, default=uuid.uuid4)
+    id: Mapped[uuid.UUID] = mapped_column(primary_key=True, default=uuid7)
     patient_id: Mapped[uuid.UUID] = mapped_column(ForeignKey("patients.id"), nullable=False)
-    vcf_upload_id: Mapped[uuid.UUID] = mapped_column(ForeignKey("vcf_uploads.id"), nullable=False)
+    vcf_upload_id: Mapped[uuid.UUID] = mapped_column(ForeignKey("vcf_uploads.id"), nullable=False, index=True)
     requested_drugs: Mapped[list | None] = mapped_column(ARRAY(String), nullable=True)
     concurrent_medications: Mapped[list | None] = mapped_column(ARRAY(String), nullable=True)
     status: Mapped[str] = mapped_column(String(20), default="queued", nullable=False)
     error_message: Mapped[str | None] = mapped_column(Text, nullable=True)
     celery_task_id: Mapped[str | None] = mapped_column(String(100), nullable=True)
     completed_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
-    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=utcnow)
+
+    # Must be eager-loaded explicitly; lazy access raises instead of issuing a query
+    vcf_upload: Mapped[VCFUpload] = relationship(lazy="raise")
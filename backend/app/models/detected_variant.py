@@ -1,20 +1,27 @@
 import uuid
-from datetime import datetime, timezone
-from sqlalchemy import String, BigInteger, Float, DateTime, ForeignKey
+from sqlalchemy import String, BigInteger, Float, ForeignKey, Index
 from sqlalchemy.orm import Mapped, mapped_column
-from app.database import Base
+from app.database import Base, uuid7
+from app.models._mixins import CreatedAtMixin
 
 
-def utcnow():
-    return datetime.now(timezone.utc)
-
-
-class DetectedVariant(Base):
+class DetectedVariant(Base, CreatedAtMixin):
     __tablename__ = "detected_variants"
+    # Leading vcf_upload_id also serves plain per-upload lookups; INCLUDE
+    # covers the /results projection so it never touches the heap.
+    __table_args__ = (
+        Index(
+            "ix_dv_upload_gene", "vcf_upload_id", "gene",
+            postgresql_include=[
+                "rsid", "position", "ref_allele", "alt_allele",
+                "genotype", "star_allele", "filter_status",
+            ],
+        ),
+    )
 
-    id: Mapped[uuid.UUID] = mapped_column(primary_key=True, default=uuid.uuid4)
+    id: Mapped[uuid.UUID] = mapped_column(primary_key=True, default=uuid7)
     vcf_upload_id: Mapped[uuid.UUID] = mapped_column(ForeignKey("vcf_uploads.id"), nullable=False)
-    patient_id: Mapped[uuid.UUID] = mapped_column(ForeignKey("patients.id"), nullable=False)
+    patient_id: Mapped[uuid.UUID] = mapped_column(ForeignKey("patients.id"), nullable=False, index=True)
     rsid: Mapped[str | None] = mapped_column(String(20), nullable=True)
     gene: Mapped[str | None] = mapped_column(String(20), nullable=True)
     chromosome: Mapped[str | None] = mapped_column(String(5), nullable=True)
@@ -25,4 +32,3 @@ class DetectedVariant(Base):
     star_allele: Mapped[str | None] = mapped_column(String(20), nullable=True)
     quality_score: Mapped[float | None] = mapped_column(Float, nullable=True)
     filter_status: Mapped[str | None] = mapped_column(String(20), nullable=True)
-    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=utcnow)
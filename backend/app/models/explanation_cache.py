@@ -0,0 +1,18 @@
+from sqlalchemy import LargeBinary, String, Text
+from sqlalchemy.orm import Mapped, mapped_column
+from app.database import Base
+from app.models._mixins import CreatedAtMixin
+
+
+class ExplanationCache(Base, CreatedAtMixin):
+    """LLM explanation text reused across patients with the same clinical inputs."""
+    __tablename__ = "llm_explanation_cache"
+
+    cache_key: Mapped[str] = mapped_column(String(64), primary_key=True)  # SHA-256 hex
+    summary: Mapped[str | None] = mapped_column(Text, nullable=True)
+    mechanism_explanation: Mapped[str | None] = mapped_column(Text, nullable=True)
+    guideline_quote: Mapped[str | None] = mapped_column(Text, nullable=True)
+    phenoconversion_note: Mapped[str | None] = mapped_column(Text, nullable=True)
+    # llm_explanation.pack_context_chunks() output
+    retrieved_context_chunks: Mapped[bytes | None] = mapped_column(LargeBinary, nullable=True)
+    llm_model_used: Mapped[str | None] = mapped_column(String(50), nullable=True)
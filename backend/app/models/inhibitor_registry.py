@@ -1,16 +1,15 @@
 import uuid
-from datetime import datetime, timezone
-from sqlalchemy import String, Float, DateTime
+from sqlalchemy import String, Float, UniqueConstraint
 from sqlalchemy.orm import Mapped, mapped_column
 from app.database import Base
+from app.models._mixins import CreatedAtMixin
 
 
-def utcnow():
-    return datetime.now(timezone.utc)
-
-
-class InhibitorInducerRegistry(Base):
+class InhibitorInducerRegistry(Base, CreatedAtMixin):
     __tablename__ = "inhibitor_inducer_registry"
+    __table_args__ = (
+        UniqueConstraint("drug_name", "gene", "interaction_type", name="uq_iir_drug_gene_type"),
+    )
 
     id: Mapped[uuid.UUID] = mapped_column(primary_key=True, default=uuid.uuid4)
     drug_name: Mapped[str] = mapped_column(String(100), nullable=False)
@@ -19,4 +18,3 @@ class InhibitorInducerRegistry(Base):
     strength: Mapped[str] = mapped_column(String(20), nullable=False)          # strong | moderate | weak
     inhibition_factor: Mapped[float] = mapped_column(Float, nullable=False)
     source: Mapped[str | None] = mapped_column(String(50), nullable=True)
-    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=utcnow)
@@ -1,29 +1,39 @@
 import uuid
-from datetime import datetime, timezone
-from sqlalchemy import String, Text, Integer, DateTime, ForeignKey
-from sqlalchemy.dialects.postgresql import JSONB
-from sqlalchemy.orm import Mapped, mapped_column
-from app.database import Base
-
+import zlib
+from typing import List
 
-def utcnow():
-    return datetime.now(timezone.utc)
+import orjson
+from sqlalchemy import String, Text, Integer, ForeignKey, LargeBinary
+from sqlalchemy.orm import Mapped, mapped_column
+from app.database import Base, uuid7
+from app.models._mixins import CreatedAtMixin
 
 
-class LLMExplanation(Base):
+class LLMExplanation(Base, CreatedAtMixin):
     __tablename__ = "llm_explanations"
 
-    id: Mapped[uuid.UUID] = mapped_column(primary_key=True, default=uuid.uuid4)
+    id: Mapped[uuid.UUID] = mapped_column(primary_key=True, default=uuid7)
     risk_analysis_id: Mapped[uuid.UUID] = mapped_column(
-        ForeignKey("risk_analyses.id"), nullable=False
+        ForeignKey("risk_analyses.id"), nullable=False, index=True
     )
     summary: Mapped[str | None] = mapped_column(Text, nullable=True)
     mechanism_explanation: Mapped[str | None] = mapped_column(Text, nullable=True)
     guideline_quote: Mapped[str | None] = mapped_column(Text, nullable=True)
     phenoconversion_note: Mapped[str | None] = mapped_column(Text, nullable=True)
-    retrieved_context_chunks: Mapped[dict | None] = mapped_column(JSONB, nullable=True)
+    # pack_context_chunks() output; read back via context_chunks
+    retrieved_context_chunks: Mapped[bytes | None] = mapped_column(LargeBinary, nullable=True)
     llm_model_used: Mapped[str | None] = mapped_column(String(50), nullable=True)
     prompt_tokens: Mapped[int | None] = mapped_column(Integer, nullable=True)
     completion_tokens: Mapped[int | None] = mapped_column(Integer, nullable=True)
     generation_time_ms: Mapped[int | None] = mapped_column(Integer, nullable=True)
-    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=utcnow)
+
+    @property
+    def context_chunks(self) -> List[str]:
+        if not self.retrieved_context_chunks:
+            return []
+        return orjson.loads(zlib.decompress(self.retrieved_context_chunks))["chunks"]
+
+
+def pack_context_chunks(chunks: List[str]) -> bytes:
+    """Compress retrieved RAG chunks for storage (zlib over orjson)."""
+    return zlib.compress(orjson.dumps({"chunks": chunks}), 6)
@@ -1,20 +1,12 @@
 import uuid
-from datetime import datetime, timezone
-from sqlalchemy import String, DateTime
+from sqlalchemy import String
 from sqlalchemy.orm import Mapped, mapped_column
 from app.database import Base
+from app.models._mixins import TimestampMixin
 
 
-def utcnow():
-    return datetime.now(timezone.utc)
-
-
-class Patient(Base):
+class Patient(Base, TimestampMixin):
     __tablename__ = "patients"
 
     id: Mapped[uuid.UUID] = mapped_column(primary_key=True, default=uuid.uuid4)
     patient_code: Mapped[str] = mapped_column(String(50), unique=True, nullable=False)
-    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=utcnow)
-    updated_at: Mapped[datetime] = mapped_column(
-        DateTime(timezone=True), default=utcnow, onupdate=utcnow
-    )
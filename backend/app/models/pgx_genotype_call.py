@@ -1,21 +1,20 @@
 import uuid
-from datetime import datetime, timezone
-from sqlalchemy import String, Float, Integer, Boolean, DateTime, ForeignKey
-from sqlalchemy.dialects.postgresql import JSONB
-from sqlalchemy.orm import Mapped, mapped_column
-from app.database import Base
-
+import zlib
+from typing import Any, Dict
 
-def utcnow():
-    return datetime.now(timezone.utc)
+import orjson
+from sqlalchemy import String, Float, Integer, Boolean, ForeignKey, LargeBinary
+from sqlalchemy.orm import Mapped, mapped_column
+from app.database import Base, uuid7
+from app.models._mixins import CreatedAtMixin
 
 
-class PGxGenotypeCall(Base):
+class PGxGenotypeCall(Base, CreatedAtMixin):
     __tablename__ = "pgx_genotype_calls"
 
-    id: Mapped[uuid.UUID] = mapped_column(primary_key=True, default=uuid.uuid4)
-    vcf_upload_id: Mapped[uuid.UUID] = mapped_column(ForeignKey("vcf_uploads.id"), nullable=False)
-    patient_id: Mapped[uuid.UUID] = mapped_column(ForeignKey("patients.id"), nullable=False)
+    id: Mapped[uuid.UUID] = mapped_column(primary_key=True, default=uuid7)
+    vcf_upload_id: Mapped[uuid.UUID] = mapped_column(ForeignKey("vcf_uploads.id"), nullable=False, index=True)
+    patient_id: Mapped[uuid.UUID] = mapped_column(ForeignKey("patients.id"), nullable=False, index=True)
     gene: Mapped[str] = mapped_column(String(20), nullable=False)
     diplotype: Mapped[str | None] = mapped_column(String(50), nullable=True)
     phenotype: Mapped[str | None] = mapped_column(String(30), nullable=True)
@@ -23,5 +22,20 @@ class PGxGenotypeCall(Base):
     copy_number: Mapped[int | None] = mapped_column(Integer, nullable=True)
     has_structural_variant: Mapped[bool] = mapped_column(Boolean, default=False)
     calling_method: Mapped[str | None] = mapped_column(String(30), nullable=True)
-    raw_pypgx_output: Mapped[dict | None] = mapped_column(JSONB, nullable=True)
-    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=utcnow)
+    # pack_raw_output() output; read back via raw_output
+    raw_pypgx_output: Mapped[bytes | None] = mapped_column(LargeBinary, nullable=True)
+
+    @property
+    def raw_output(self) -> Dict[str, Any]:
+        if not self.raw_pypgx_output:
+            return {}
+        return orjson.loads(zlib.decompress(self.raw_pypgx_output))
+
+
+def pack_raw_output(raw: Dict[str, Any]) -> bytes | None:
+    """Compress a PyPGx result dict for storage (zlib over orjson)."""
+    if not raw:
+        return None
+    return zlib.compress(
+        orjson.dumps(raw, option=orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY), 6
+    )
@@ -1,19 +1,19 @@
 import uuid
-from datetime import datetime, timezone
-from sqlalchemy import String, Text, Float, Boolean, DateTime, ForeignKey
+from sqlalchemy import String, Text, Float, Boolean, ForeignKey, Index
 from sqlalchemy.dialects.postgresql import ARRAY
 from sqlalchemy.orm import Mapped, mapped_column
-from app.database import Base
+from app.database import Base, uuid7
+from app.models._mixins import TimestampMixin
 
 
-def utcnow():
-    return datetime.now(timezone.utc)
-
-
-class RiskAnalysis(Base):
+class RiskAnalysis(Base, TimestampMixin):
     __tablename__ = "risk_analyses"
+    __table_args__ = (
+        Index("ix_ra_patient_drug", "patient_id", "drug_name"),
+        Index("ix_ra_vcf_patient", "vcf_upload_id", "patient_id"),
+    )
 
-    id: Mapped[uuid.UUID] = mapped_column(primary_key=True, default=uuid.uuid4)
+    id: Mapped[uuid.UUID] = mapped_column(primary_key=True, default=uuid7)
     patient_id: Mapped[uuid.UUID] = mapped_column(ForeignKey("patients.id"), nullable=False)
     vcf_upload_id: Mapped[uuid.UUID] = mapped_column(ForeignKey("vcf_uploads.id"), nullable=False)
     drug_name: Mapped[str] = mapped_column(String(100), nullable=False)
@@ -33,7 +33,3 @@ class RiskAnalysis(Base):
     alternative_drugs: Mapped[list | None] = mapped_column(ARRAY(String), nullable=True)
     cpic_guideline_version: Mapped[str | None] = mapped_column(String(20), nullable=True)
     cpic_evidence_level: Mapped[str | None] = mapped_column(String(5), nullable=True)
-    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=utcnow)
-    updated_at: Mapped[datetime] = mapped_column(
-        DateTime(timezone=True), default=utcnow, onupdate=utcnow
-    )
@@ -1,27 +1,21 @@
 import uuid
-from datetime import datetime, timezone
-from sqlalchemy import String, Text, Integer, DateTime, ForeignKey
+from sqlalchemy import String, Text, Integer, ForeignKey, Index
 from sqlalchemy.orm import Mapped, mapped_column
 from app.database import Base
+from app.models._mixins import TimestampMixin
 
 
-def utcnow():
-    return datetime.now(timezone.utc)
-
-
-class VCFUpload(Base):
+class VCFUpload(Base, TimestampMixin):
     __tablename__ = "vcf_uploads"
+    __table_args__ = (Index("ix_vcf_patient_sha256", "patient_id", "content_sha256"),)
 
     id: Mapped[uuid.UUID] = mapped_column(primary_key=True, default=uuid.uuid4)
     patient_id: Mapped[uuid.UUID] = mapped_column(ForeignKey("patients.id"), nullable=False)
     filename: Mapped[str] = mapped_column(String(255), nullable=False)
     file_path: Mapped[str] = mapped_column(Text, nullable=False)
     file_size_bytes: Mapped[int] = mapped_column(Integer, nullable=False)
+    content_sha256: Mapped[str | None] = mapped_column(String(64), nullable=True)
     parsing_status: Mapped[str] = mapped_column(String(20), default="pending", nullable=False)
     parsing_error: Mapped[str | None] = mapped_column(Text, nullable=True)
     vcf_version: Mapped[str | None] = mapped_column(String(10), nullable=True)
     total_variants_found: Mapped[int | None] = mapped_column(Integer, nullable=True)
-    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=utcnow)
-    updated_at: Mapped[datetime] = mapped_column(
-        DateTime(timezone=True), default=utcnow, onupdate=utcnow
-    )
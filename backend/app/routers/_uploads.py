@@ -0,0 +1,60 @@
+"""
+VCF upload storage shared by the /analyze and /upload routes.
+"""
+from __future__ import annotations
+import asyncio
+import hashlib
+import os
+import uuid
+from typing import BinaryIO, Tuple
+
+from fastapi import HTTPException, UploadFile
+
+from app.config import settings
+
+MAX_BYTES = settings.MAX_FILE_SIZE_MB * 1024 * 1024
+_UPLOAD_CHUNK_BYTES = 64 * 1024
+
+
+def file_too_large() -> HTTPException:
+    return HTTPException(
+        status_code=400,
+        detail={
+            "success": False,
+            "data": None,
+            "error": f"File exceeds {settings.MAX_FILE_SIZE_MB} MB limit",
+        },
+    )
+
+
+async def stream_to_disk(upload: UploadFile, file_path: str) -> Tuple[int, str]:
+    """
+    Copy the upload to disk chunk by chunk, enforcing MAX_BYTES as it goes.
+    The data lands in a sibling temp file that only replaces file_path once
+    complete, so a rejected upload never touches an earlier file of the
+    same name. The whole copy (file I/O and hashing) runs in a worker
+    thread. Returns (size in bytes, SHA-256 hex digest of the content).
+    """
+    return await asyncio.to_thread(_copy_to_disk, upload.file, file_path)
+
+
+def _copy_to_disk(src: BinaryIO, file_path: str) -> Tuple[int, str]:
+    total = 0
+    digest = hashlib.sha256()
+    tmp_path = f"{file_path}.{uuid.uuid4().hex}.part"
+    try:
+        with open(tmp_path, "wb") as f:
+            while chunk := src.read(_UPLOAD_CHUNK_BYTES):
+                total += len(chunk)
+                if total > MAX_BYTES:
+                    raise file_too_large()
+                digest.update(chunk)
+                f.write(chunk)
+        os.replace(tmp_path, file_path)
+    except BaseException:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise
+    return total, digest.hexdigest()
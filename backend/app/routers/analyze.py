@@ -6,7 +6,7 @@ runs the full pipeline, and returns results immediately.
 Steps internally:
   1. Validate & save the VCF file
   2. Get or create Patient record
-  3. Parse VCF synchronously
+  3. Parse VCF (worker process, off the event loop)
   4. Run full PGx pipeline (genotyping → risk → LLM explanation)
   5. Return complete results
 """
@@ -14,25 +14,29 @@ from __future__ import annotations
 import os
 import uuid
 from datetime import datetime, timezone
-from typing import List, Optional
+from functools import lru_cache
+from typing import List
 
 from fastapi import APIRouter, Depends, File, Form, HTTPException, UploadFile
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.database import get_db
+from app.database import get_db, uuid7
 from app.config import settings
+from app.routers._uploads import MAX_BYTES, file_too_large, stream_to_disk
 from app.models.patient import Patient
 from app.models.vcf_upload import VCFUpload
 from app.models.detected_variant import DetectedVariant
 from app.models.analysis_request import AnalysisRequest
-from app.services.vcf_parser import VCFParser
-from app.services.cpic_engine import SUPPORTED_DRUGS
+from app.services.vcf_parser import parse_vcf_async
+from app.services.cpic_engine import DRUG_TO_GENE, SUPPORTED_DRUGS
 from app.services.pipeline import run_analysis_pipeline
 from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 
 router = APIRouter()
 
-MAX_BYTES = settings.MAX_FILE_SIZE_MB * 1024 * 1024
+# Per-patient upload directories already created by this process
+_ensured_dirs: set[str] = set()
 
 
 @router.post("/analyze")
@@ -59,6 +63,8 @@ async def analyze(
     - Return structured risk + LLM explanation results
     """
 
+    now = datetime.now(timezone.utc)
+
     # ── 1. Validate file ──────────────────────────────────────────────────────
     if not vcf_file.filename.endswith(".vcf"):
         raise HTTPException(
@@ -66,19 +72,13 @@ async def analyze(
             detail={"success": False, "data": None, "error": "Only .vcf files are accepted"},
         )
 
-    content = await vcf_file.read()
-    if len(content) > MAX_BYTES:
-        raise HTTPException(
-            status_code=400,
-            detail={
-                "success": False,
-                "data": None,
-                "error": f"File exceeds {settings.MAX_FILE_SIZE_MB} MB limit",
-            },
-        )
+    # Reject early when the client declared a size; the copy in step 4
+    # re-checks while streaming.
+    if vcf_file.size is not None and vcf_file.size > MAX_BYTES:
+        raise file_too_large()
 
     # ── 2. Parse & validate drug list ─────────────────────────────────────────
-    drug_list: List[str] = [d.strip().upper() for d in drugs.split(",") if d.strip()]
+    drug_list: List[str] = _csv_upper(drugs)
     if not drug_list:
         raise HTTPException(
             status_code=400,
@@ -92,50 +92,39 @@ async def analyze(
             detail={
                 "success": False,
                 "data": None,
-                "error": f"Unsupported drugs: {bad_drugs}. Supported: {list(SUPPORTED_DRUGS)}",
+                "error": f"Unsupported drugs: {bad_drugs}. Supported: {list(DRUG_TO_GENE)}",
             },
         )
 
-    med_list: List[str] = [m.strip().upper() for m in concurrent_medications.split(",") if m.strip()]
+    med_list: List[str] = _csv_upper(concurrent_medications)
 
     # ── 3. Get or create Patient ───────────────────────────────────────────────
-    stmt = select(Patient).where(Patient.patient_code == patient_code)
-    patient: Optional[Patient] = (await db.execute(stmt)).scalars().first()
-    if not patient:
-        patient = Patient(
-            id=uuid.uuid4(),
-            patient_code=patient_code,
-            created_at=datetime.now(timezone.utc),
-            updated_at=datetime.now(timezone.utc),
-        )
-        db.add(patient)
-        await db.flush()
+    patient_id = await _get_or_create_patient(db, patient_code)
 
     # ── 4. Save file to disk ───────────────────────────────────────────────────
-    upload_dir = os.path.join(settings.UPLOAD_DIR, str(patient.id))
-    os.makedirs(upload_dir, exist_ok=True)
+    upload_dir = os.path.join(settings.UPLOAD_DIR, str(patient_id))
+    if upload_dir not in _ensured_dirs:
+        os.makedirs(upload_dir, exist_ok=True)
+        _ensured_dirs.add(upload_dir)
     file_path = os.path.join(upload_dir, vcf_file.filename)
-    with open(file_path, "wb") as f:
-        f.write(content)
+    file_size, content_sha256 = await stream_to_disk(vcf_file, file_path)
 
     # ── 5. Create VCFUpload record ─────────────────────────────────────────────
-    now = datetime.now(timezone.utc)
     vcf_upload = VCFUpload(
         id=uuid.uuid4(),
-        patient_id=patient.id,
+        patient_id=patient_id,
         filename=vcf_file.filename,
         file_path=file_path,
-        file_size_bytes=len(content),
+        file_size_bytes=file_size,
+        content_sha256=content_sha256,
         parsing_status="processing",
         created_at=now,
         updated_at=now,
     )
-    db.add(vcf_upload)
-    await db.flush()
+    db.add(vcf_upload)  # inserted with its final status at the next flush
 
-    # ── 6. Parse VCF synchronously ─────────────────────────────────────────────
-    parser = VCFParser()
-    parse_result = parser.parse(file_path)
+    # ── 6. Parse VCF in a worker process ───────────────────────────────────────
+    parse_result = await parse_vcf_async(file_path)
 
     if not parse_result.success:
         vcf_upload.parsing_status = "failed"
@@ -155,32 +144,14 @@ async def analyze(
     vcf_upload.total_variants_found = parse_result.total_variants
     vcf_upload.updated_at = datetime.now(timezone.utc)
 
-    # ── 7. Save detected variants ──────────────────────────────────────────────
-    for v in parse_result.variants:
-        dv = DetectedVariant(
-            id=uuid.uuid4(),
-            vcf_upload_id=vcf_upload.id,
-            patient_id=patient.id,
-            rsid=v.get("rsid"),
-            gene=v.get("gene"),
-            chromosome=v.get("chromosome"),
-            position=v.get("position"),
-            ref_allele=v.get("ref_allele"),
-            alt_allele=v.get("alt_allele"),
-            genotype=v.get("genotype"),
-            star_allele=v.get("star_allele"),
-            quality_score=v.get("quality_score"),
-            filter_status=v.get("filter_status"),
-            created_at=now,
-        )
-        db.add(dv)
-
-    await db.commit()
+    # ── 7. Save detected variants (COPY, bypasses the ORM) ────────────────────
+    await db.flush()  # COPY can't see pending ORM rows; the FK needs vcf_upload
+    await _copy_variants(db, parse_result.variants, vcf_upload.id, patient_id)
 
     # ── 8. Create AnalysisRequest ──────────────────────────────────────────────
     req = AnalysisRequest(
-        id=uuid.uuid4(),
-        patient_id=patient.id,
+        id=uuid7(),
+        patient_id=patient_id,
         vcf_upload_id=vcf_upload.id,
         requested_drugs=drug_list,
         concurrent_medications=med_list,
@@ -188,10 +159,10 @@ async def analyze(
         created_at=now,
     )
     db.add(req)
-    await db.commit()
-    await db.refresh(req)
 
     # ── 9. Run full pipeline synchronously ─────────────────────────────────────
+    # Steps 3-8 share one transaction; the pipeline's first status commit
+    # persists them together.
     try:
         results = await run_analysis_pipeline(
             analysis_request_id=req.id,
@@ -213,10 +184,10 @@ async def analyze(
         return {
             "success": True,
             "data": {
-                "patient_id": str(patient.id),
-                "patient_code": patient.patient_code,
-                "analysis_request_id": str(req.id),
-                "vcf_upload_id": str(vcf_upload.id),
+                "patient_id": patient_id,
+                "patient_code": patient_code,
+                "analysis_request_id": req.id,
+                "vcf_upload_id": vcf_upload.id,
                 "total_variants_parsed": parse_result.total_variants,
                 "status": "complete",
                 "gene_panel": gene_panel,
@@ -231,6 +202,75 @@ async def analyze(
 
 # ── helpers ────────────────────────────────────────────────────────────────────
 
+def _csv_upper(raw: str) -> List[str]:
+    """Split a comma-separated form field into stripped, upper-cased tokens."""
+    return [t for t in (p.strip().upper() for p in raw.split(",")) if t]
+
+
+async def _get_or_create_patient(db: AsyncSession, patient_code: str) -> uuid.UUID:
+    """Upsert by patient_code; one round-trip unless the patient already exists."""
+    stmt = (
+        pg_insert(Patient)
+        .values(patient_code=patient_code)
+        .on_conflict_do_nothing(index_elements=["patient_code"])
+        .returning(Patient.id)
+    )
+    patient_id = (await db.execute(stmt)).scalar()
+    if patient_id is None:
+        lookup = select(Patient.id).where(Patient.patient_code == patient_code)
+        patient_id = (await db.execute(lookup)).scalar_one()
+    return patient_id
+
+
+_VARIANT_COPY_COLUMNS = [
+    "id", "vcf_upload_id", "patient_id", "rsid", "gene", "chromosome", "position",
+    "ref_allele", "alt_allele", "genotype", "star_allele", "quality_score",
+    "filter_status",
+]
+
+
+async def _copy_variants(
+    db: AsyncSession,
+    variants: List[dict],
+    vcf_upload_id: uuid.UUID,
+    patient_id: uuid.UUID,
+) -> None:
+    """
+    Stream parsed variants into detected_variants via PostgreSQL COPY.
+    Runs on the session's own connection, so it shares the open transaction
+    (the upserted Patient and flushed VCFUpload rows satisfy the FKs). created_at is
+    left to the column's server default. Records are generated lazily as
+    COPY consumes them, so no second row list is built alongside `variants`.
+    """
+    if not variants:
+        return
+    records = (
+        (
+            uuid7(),
+            vcf_upload_id,
+            patient_id,
+            v.get("rsid"),
+            v.get("gene"),
+            v.get("chromosome"),
+            v.get("position"),
+            v.get("ref_allele"),
+            v.get("alt_allele"),
+            v.get("genotype"),
+            v.get("star_allele"),
+            v.get("quality_score"),
+            v.get("filter_status"),
+        )
+        for v in variants
+    )
+    conn = await db.connection()
+    raw = await conn.get_raw_connection()
+    await raw.driver_connection.copy_records_to_table(
+        DetectedVariant.__tablename__,
+        records=records,
+        columns=_VARIANT_COPY_COLUMNS,
+    )
+
+
 _PHENOTYPE_SUMMARIES = {
     "PM": "cannot metabolize {gene} substrates effectively — enzyme activity is absent",
     "IM": "has reduced {gene} enzyme activity — drug metabolism may be slower than normal",
@@ -240,6 +280,18 @@ _PHENOTYPE_SUMMARIES = {
     "UM": "has greatly increased {gene} enzyme activity — rapid drug metabolism may reduce efficacy or increase toxicity",
 }
 
+# Each template pre-split around its single {gene} slot: (prefix, suffix)
+_SUMMARY_PARTS = {
+    key: tuple(f"This patient {tmpl}".split("{gene}", 1))
+    for key, tmpl in _PHENOTYPE_SUMMARIES.items()
+}
+
+
+@lru_cache(maxsize=64)
+def _summary_for(gene: str, phenotype: str) -> str:
+    prefix, suffix = _SUMMARY_PARTS.get(phenotype, _SUMMARY_PARTS["NM"])
+    return prefix + gene + suffix
+
 
 def _build_gene_panel(results):
     """
@@ -254,8 +306,7 @@ def _build_gene_panel(results):
             continue
 
         phenotype = pgx.get("phenotype", "Unknown")
-        pheno_key = phenotype if phenotype in _PHENOTYPE_SUMMARIES else "NM"
-        summary = f"This patient {_PHENOTYPE_SUMMARIES[pheno_key].format(gene=gene)}"
+        summary = _summary_for(gene, phenotype)
 
         variants = pgx.get("detected_variants", [])
 
@@ -2,20 +2,23 @@
 GET /api/v1/supported-drugs
 Returns the list of supported drugs and their primary genes.
 """
-from fastapi import APIRouter
+from fastapi import APIRouter, Response
 from app.services.cpic_engine import DRUG_TO_GENE
 from app.schemas.schemas import APIResponse, SupportedDrugSchema
 
 router = APIRouter()
 
+# Static for the life of the process — built once at import.
+_SUPPORTED_DRUGS_PAYLOAD = APIResponse(
+    success=True,
+    data=[{"drug": drug, "primary_gene": gene} for drug, gene in DRUG_TO_GENE.items()],
+)
+
 
 @router.get("/supported-drugs", response_model=APIResponse[list])
-async def supported_drugs():
-    data = [
-        {"drug": drug, "primary_gene": gene}
-        for drug, gene in DRUG_TO_GENE.items()
-    ]
-    return APIResponse(success=True, data=data)
+async def supported_drugs(response: Response):
+    response.headers["Cache-Control"] = "public, max-age=3600"
+    return _SUPPORTED_DRUGS_PAYLOAD
 
 
 @router.get("/health")
@@ -6,12 +6,21 @@ Accepts either:
   - A string → looked up as Patient.patient_code
 """
 from __future__ import annotations
-
+import asyncio
+import re
+import uuid
+from collections import OrderedDict, defaultdict
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Mapping
+
+import orjson
 from fastapi import APIRouter, Depends, HTTPException
+from fastapi.responses import Response
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
+from sqlalchemy.orm import selectinload
 
-from app.database import get_db
+from app.database import AsyncSessionLocal, get_db
 from app.models.analysis_request import AnalysisRequest
 from app.models.risk_analysis import RiskAnalysis
 from app.models.llm_explanation import LLMExplanation
@@ -23,6 +32,54 @@ from app.services.pipeline import _build_result
 
 router = APIRouter()
 
+# Serialized response bodies for completed requests, keyed by
+# analysis_request_id (LRU, process-local).
+_RESULTS_CACHE_SIZE = 256
+_results_cache: "OrderedDict[uuid.UUID, bytes]" = OrderedDict()
+
+# Canonical hyphenated UUID; anything else is treated as a patient code
+_UUID_RE = re.compile(
+    r"^[0-9a-fA-F]{8}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{12}$"
+)
+
+# Fixed envelope around the "data" object, joined with the per-drug results
+_DATA_HEAD_PREFIX = b'{"success":true,"data":'
+_BODY_TAIL = b']},"error":null}'
+
+
+async def _fetch_all(stmt) -> list:
+    """
+    Run a read-only SELECT on its own pooled session so several can be
+    awaited concurrently (one AsyncSession must not be shared across tasks).
+    Returned rows are detached but fully loaded.
+    """
+    async with AsyncSessionLocal() as session:
+        return list((await session.execute(stmt)).scalars().all())
+
+
+async def _fetch_mappings(stmt) -> list:
+    """Like _fetch_all, for column projections: returns one mapping per row."""
+    async with AsyncSessionLocal() as session:
+        return list((await session.execute(stmt)).mappings().all())
+
+
+async def _group_variants_by_gene(stmt) -> Dict[str, List[Mapping[str, Any]]]:
+    """
+    Stream variant rows through a server-side cursor in batches and bucket
+    them by gene as they arrive, rather than buffering the whole result.
+    """
+    grouped: Dict[str, List[Mapping[str, Any]]] = defaultdict(list)
+    async with AsyncSessionLocal() as session:
+        result = await session.stream(stmt.execution_options(yield_per=1000))
+        async for v in result.mappings():
+            grouped[v["gene"]].append(v)
+    return grouped
+
+
+def _render_result(**kwargs) -> bytes:
+    """_build_result plus serialization; runs in a worker thread."""
+    return orjson.dumps(_build_result(**kwargs))
+
 
 @router.get("/results/{patient_id}")
 async def get_results(
@@ -40,12 +97,8 @@ async def get_results(
     patient: Patient | None = None
 
     # Try UUID first
-    import uuid as _uuid
-    try:
-        pid = _uuid.UUID(patient_id)
-        patient = await db.get(Patient, pid)
-    except ValueError:
-        pass
+    if _UUID_RE.match(patient_id):
+        patient = await db.get(Patient, uuid.UUID(patient_id))
 
     # Fall back to patient_code lookup
     if not patient:
@@ -58,28 +111,34 @@ async def get_results(
             detail={"success": False, "data": None, "error": f"Patient '{patient_id}' not found"},
         )
 
-    # ── 2. Load all completed analysis requests for this patient ──────────────
+    # ── 2. Load the latest completed analysis request (with its upload) ───────
     req_stmt = (
         select(AnalysisRequest)
+        .options(selectinload(AnalysisRequest.vcf_upload))
         .where(
             AnalysisRequest.patient_id == patient.id,
             AnalysisRequest.status == "complete",
         )
         .order_by(AnalysisRequest.created_at.desc())
+        .limit(1)
     )
-    requests = (await db.execute(req_stmt)).scalars().all()
+    req: AnalysisRequest | None = (await db.execute(req_stmt)).scalar_one_or_none()
 
-    if not requests:
+    if req is None:
         # Check if there are any requests at all (might still be processing)
-        any_stmt = select(AnalysisRequest).where(AnalysisRequest.patient_id == patient.id)
-        any_req = (await db.execute(any_stmt)).scalars().first()
-        if any_req:
+        any_stmt = (
+            select(AnalysisRequest.status)
+            .where(AnalysisRequest.patient_id == patient.id)
+            .limit(1)
+        )
+        any_status = (await db.execute(any_stmt)).scalar_one_or_none()
+        if any_status is not None:
             return {
                 "success": True,
                 "data": {
-                    "patient_id": str(patient.id),
+                    "patient_id": patient.id,
                     "patient_code": patient.patient_code,
-                    "status": any_req.status,
+                    "status": any_status,
                     "results": [],
                 },
                 "error": None,
@@ -94,81 +153,97 @@ async def get_results(
         )
 
     # ── 3. Assemble results from most-recent analysis request ─────────────────
-    # Use the most recent completed request
-    req = requests[0]
-
-    vcf_upload: VCFUpload = await db.get(VCFUpload, req.vcf_upload_id)
-
-    # Gene calls for quality metrics
-    gene_stmt = select(PGxGenotypeCall).where(
+    # Completed analyses never change, so the assembled body is reusable
+    cached = _results_cache.get(req.id)
+    if cached is not None:
+        _results_cache.move_to_end(req.id)
+        return Response(content=cached, media_type="application/json")
+
+    # Gene calls (for quality metrics) and risk rows are independent reads,
+    # so they run concurrently on separate pooled sessions.
+    gene_stmt = select(PGxGenotypeCall.gene, PGxGenotypeCall.phenotype).where(
         PGxGenotypeCall.vcf_upload_id == req.vcf_upload_id
     )
-    gene_calls = (await db.execute(gene_stmt)).scalars().all()
-    genes_ok = [c.gene for c in gene_calls if (c.phenotype or "") != "Unknown"]
-    genes_failed = [c.gene for c in gene_calls if (c.phenotype or "") == "Unknown"]
-
-    # Risk rows for this request
     risk_stmt = select(RiskAnalysis).where(
         RiskAnalysis.vcf_upload_id == req.vcf_upload_id,
         RiskAnalysis.patient_id == patient.id,
     )
-    risk_rows = (await db.execute(risk_stmt)).scalars().all()
+    gene_calls, all_risk_rows = await asyncio.gather(
+        _fetch_mappings(gene_stmt), _fetch_all(risk_stmt)
+    )
+    vcf_upload: VCFUpload | None = req.vcf_upload
+
+    genes_ok: List[str] = []
+    genes_failed: List[str] = []
+    for c in gene_calls:
+        (genes_failed if (c["phenotype"] or "") == "Unknown" else genes_ok).append(c["gene"])
 
-    results = []
-    for risk_row in risk_rows:
-        if risk_row.drug_name not in (req.requested_drugs or []):
-            continue
+    # Risk rows for this request
+    requested_drugs = frozenset(req.requested_drugs or ())
+    risk_rows = [r for r in all_risk_rows if r.drug_name in requested_drugs]
 
-        # LLM explanation
+    # LLM explanations and gene variants for all rows, one query each
+    llm_by_risk: Dict[uuid.UUID, LLMExplanation] = {}
+    variants_by_gene: Dict[str, List[Mapping[str, Any]]] = {}
+    if risk_rows:
         llm_stmt = select(LLMExplanation).where(
-            LLMExplanation.risk_analysis_id == risk_row.id
+            LLMExplanation.risk_analysis_id.in_([r.id for r in risk_rows])
         )
-        llm_rec = (await db.execute(llm_stmt)).scalars().first()
-
-        # Gene variants for this drug
-        primary_gene_base = (risk_row.primary_gene or "").split("+")[0]
-        var_stmt = select(DetectedVariant).where(
+        gene_bases = {(r.primary_gene or "").split("+")[0] for r in risk_rows}
+        var_stmt = select(
+            DetectedVariant.rsid,
+            DetectedVariant.gene,
+            DetectedVariant.position,
+            DetectedVariant.ref_allele,
+            DetectedVariant.alt_allele,
+            DetectedVariant.genotype,
+            DetectedVariant.star_allele,
+            DetectedVariant.filter_status,
+        ).where(
             DetectedVariant.vcf_upload_id == req.vcf_upload_id,
-            DetectedVariant.gene == primary_gene_base,
+            DetectedVariant.gene.in_(gene_bases),
         )
-        gene_variants = (await db.execute(var_stmt)).scalars().all()
-        variant_dicts = [
-            {
-                "rsid": v.rsid,
-                "gene": v.gene,
-                "position": v.position,
-                "ref_allele": v.ref_allele,
-                "alt_allele": v.alt_allele,
-                "genotype": v.genotype,
-                "star_allele": v.star_allele,
-                "filter_status": v.filter_status,
-            }
-            for v in gene_variants
-        ]
-
-        results.append(
-            _build_result(
-                patient=patient,
-                drug=risk_row.drug_name,
-                risk_row=risk_row,
-                llm_rec=llm_rec,
-                gene_variants=variant_dicts,
-                vcf_upload=vcf_upload,
-                genes_called_ok=genes_ok,
-                genes_failed=genes_failed,
-            )
+        llm_recs, variants_by_gene = await asyncio.gather(
+            _fetch_all(llm_stmt), _group_variants_by_gene(var_stmt)
         )
 
-    return {
-        "success": True,
-        "data": {
-            "patient_id": str(patient.id),
-            "patient_code": patient.patient_code,
-            "analysis_request_id": str(req.id),
-            "status": req.status,
-            "completed_at": req.completed_at.isoformat() if req.completed_at else None,
-            "total_variants_parsed": vcf_upload.total_variants_found if vcf_upload else 0,
-            "results": results,
-        },
-        "error": None,
-    }
+        for rec in llm_recs:
+            llm_by_risk.setdefault(rec.risk_analysis_id, rec)
+
+    head = _DATA_HEAD_PREFIX + orjson.dumps({
+        "patient_id": patient.id,
+        "patient_code": patient.patient_code,
+        "analysis_request_id": req.id,
+        "status": req.status,
+        "completed_at": req.completed_at,
+        "total_variants_parsed": vcf_upload.total_variants_found if vcf_upload else 0,
+    })[:-1] + b',"results":['
+
+    # Build + serialize each drug result concurrently in worker threads so
+    # the event loop stays free. All of them finish before the response
+    # starts, so a render error surfaces as a normal 500 rather than a
+    # truncated 200 body.
+    timestamp = datetime.now(timezone.utc).isoformat()
+    chunks = await asyncio.gather(*(
+        asyncio.to_thread(
+            _render_result,
+            patient=patient,
+            drug=risk_row.drug_name,
+            risk_row=risk_row,
+            llm_rec=llm_by_risk.get(risk_row.id),
+            gene_variants=variants_by_gene.get(
+                (risk_row.primary_gene or "").split("+")[0], []
+            ),
+            vcf_upload=vcf_upload,
+            genes_called_ok=genes_ok,
+            genes_failed=genes_failed,
+            timestamp=timestamp,
+        )
+        for risk_row in risk_rows
+    ))
+
+    body = head + b",".join(chunks) + _BODY_TAIL
+    _results_cache[req.id] = body
+    if len(_results_cache) > _RESULTS_CACHE_SIZE:
+        _results_cache.popitem(last=False)
+    return Response(content=body, media_type="application/json")
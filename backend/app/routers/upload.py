@@ -9,22 +9,27 @@ from datetime import datetime, timezone
 
 from fastapi import APIRouter, Depends, File, Form, HTTPException, UploadFile
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
+from sqlalchemy import distinct, insert, select
 
-from app.database import get_db
+from app.database import get_db, uuid7
 from app.config import settings
+from app.routers._uploads import MAX_BYTES, file_too_large, stream_to_disk
 from app.models.patient import Patient
 from app.models.vcf_upload import VCFUpload
 from app.models.detected_variant import DetectedVariant
-from app.services.vcf_parser import VCFParser
+from app.services.vcf_parser import parse_vcf_async
 from app.schemas.schemas import APIResponse, UploadResponse
 
 router = APIRouter()
 
-MAX_BYTES = settings.MAX_FILE_SIZE_MB * 1024 * 1024
 
-
-@router.post("/upload", response_model=APIResponse[UploadResponse])
+# response_model=None: the model_construct() results below are serialized
+# as-is instead of being re-validated; the schema is still documented.
+@router.post(
+    "/upload",
+    response_model=None,
+    responses={200: {"model": APIResponse[UploadResponse]}},
+)
 async def upload_vcf(
     vcf_file: UploadFile = File(...),
     patient_code: str = Form(default="PATIENT_UNKNOWN"),
@@ -37,16 +42,8 @@ async def upload_vcf(
             detail={"success": False, "data": None, "error": "Only .vcf files are accepted"},
         )
 
-    content = await vcf_file.read()
-    if len(content) > MAX_BYTES:
-        raise HTTPException(
-            status_code=400,
-            detail={
-                "success": False,
-                "data": None,
-                "error": f"File exceeds {settings.MAX_FILE_SIZE_MB} MB limit",
-            },
-        )
+    if vcf_file.size is not None and vcf_file.size > MAX_BYTES:
+        raise file_too_large()
 
     # ── 2. Get or create patient ──────────────────────────────────────────
     stmt = select(Patient).where(Patient.patient_code == patient_code)
@@ -65,17 +62,50 @@ async def upload_vcf(
     upload_dir = os.path.join(settings.UPLOAD_DIR, str(patient.id))
     os.makedirs(upload_dir, exist_ok=True)
     file_path = os.path.join(upload_dir, vcf_file.filename)
-    with open(file_path, "wb") as f:
-        f.write(content)
+    file_size, content_sha256 = await stream_to_disk(vcf_file, file_path)
+
+    # ── 4. Short-circuit re-uploads of an already-parsed file ─────────────
+    dup_stmt = (
+        select(VCFUpload)
+        .where(
+            VCFUpload.patient_id == patient.id,
+            VCFUpload.content_sha256 == content_sha256,
+            VCFUpload.parsing_status == "success",
+        )
+        .order_by(VCFUpload.created_at.desc())
+        .limit(1)
+    )
+    existing: VCFUpload | None = (await db.execute(dup_stmt)).scalars().first()
+    if existing is not None:
+        if existing.file_path != file_path:
+            os.remove(file_path)
+        genes_stmt = select(distinct(DetectedVariant.gene)).where(
+            DetectedVariant.vcf_upload_id == existing.id,
+            DetectedVariant.gene.is_not(None),
+        )
+        genes = (await db.execute(genes_stmt)).scalars().all()
+        await db.commit()
+        return APIResponse.model_construct(
+            success=True,
+            data=UploadResponse.model_construct(
+                vcf_upload_id=existing.id,
+                patient_id=patient.id,
+                patient_code=patient.patient_code,
+                parsing_status="success",
+                total_variants_found=existing.total_variants_found or 0,
+                genes_detected=sorted(genes),
+            ),
+        )
 
-    # ── 4. Create vcf_uploads record ─────────────────────────────────────
+    # ── 5. Create vcf_uploads record ──────────────────────────────────────
     now = datetime.now(timezone.utc)
     vcf_upload = VCFUpload(
         id=uuid.uuid4(),
         patient_id=patient.id,
         filename=vcf_file.filename,
         file_path=file_path,
-        file_size_bytes=len(content),
+        file_size_bytes=file_size,
+        content_sha256=content_sha256,
         parsing_status="processing",
         created_at=now,
         updated_at=now,
@@ -83,15 +113,14 @@ async def upload_vcf(
     db.add(vcf_upload)
     await db.flush()
 
-    # ── 5. Parse VCF synchronously ────────────────────────────────────────
-    parser = VCFParser()
-    parse_result = parser.parse(file_path)
+    # ── 6. Parse VCF in a worker process ──────────────────────────────────
+    parse_result = await parse_vcf_async(file_path)
 
     if not parse_result.success:
         vcf_upload.parsing_status = "failed"
         vcf_upload.parsing_error = parse_result.error
         await db.commit()
-        return APIResponse(
+        return APIResponse.model_construct(
             success=False,
             data=None,
             error=parse_result.error,
@@ -102,34 +131,34 @@ async def upload_vcf(
     vcf_upload.total_variants_found = parse_result.total_variants
     vcf_upload.updated_at = datetime.now(timezone.utc)
 
-    # ── 6. Save detected variants ─────────────────────────────────────────
-    genes_seen: set[str] = set()
-    for v in parse_result.variants:
-        if v.get("gene"):
-            genes_seen.add(v["gene"])
-        dv = DetectedVariant(
-            id=uuid.uuid4(),
-            vcf_upload_id=vcf_upload.id,
-            patient_id=patient.id,
-            rsid=v.get("rsid"),
-            gene=v.get("gene"),
-            chromosome=v.get("chromosome"),
-            position=v.get("position"),
-            ref_allele=v.get("ref_allele"),
-            alt_allele=v.get("alt_allele"),
-            genotype=v.get("genotype"),
-            star_allele=v.get("star_allele"),
-            quality_score=v.get("quality_score"),
-            filter_status=v.get("filter_status"),
-            created_at=now,
-        )
-        db.add(dv)
+    # ── 7. Save detected variants (single executemany INSERT) ─────────────
+    genes_seen: set[str] = {v["gene"] for v in parse_result.variants if v.get("gene")}
+    rows = [
+        {
+            "id": uuid7(),
+            "vcf_upload_id": vcf_upload.id,
+            "patient_id": patient.id,
+            "rsid": v.get("rsid"),
+            "gene": v.get("gene"),
+            "chromosome": v.get("chromosome"),
+            "position": v.get("position"),
+            "ref_allele": v.get("ref_allele"),
+            "alt_allele": v.get("alt_allele"),
+            "genotype": v.get("genotype"),
+            "star_allele": v.get("star_allele"),
+            "quality_score": v.get("quality_score"),
+            "filter_status": v.get("filter_status"),
+        }
+        for v in parse_result.variants
+    ]
+    if rows:
+        await db.execute(insert(DetectedVariant), rows)
 
     await db.commit()
 
-    return APIResponse(
+    return APIResponse.model_construct(
         success=True,
-        data=UploadResponse(
+        data=UploadResponse.model_construct(
             vcf_upload_id=vcf_upload.id,
             patient_id=patient.id,
             patient_code=patient.patient_code,
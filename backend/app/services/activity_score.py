@@ -3,6 +3,7 @@ Activity score calculator — star allele → numeric activity → phenotype lab
 All mappings are deterministic and hardcoded per CPIC guidelines.
 """
 from __future__ import annotations
+from functools import lru_cache
 from typing import Dict, Optional
 
 # ---------------------------------------------------------------------------
@@ -48,9 +49,19 @@ _GENE_MAP: Dict[str, Dict[str, float]] = {
     "SLCO1B1": _SLCO1B1_ALLELE_VALUES,
 }
 
+# Each map also answers its upper-cased spellings ("HAPB3", "*3A"), so
+# most lookups hit on the first try.
+_GENE_MAP = {
+    gene: {k.upper(): v for k, v in values.items()} | values
+    for gene, values in _GENE_MAP.items()
+}
+
+_NO_DIPLOTYPE = frozenset(("Unknown", ""))
+
 # ---------------------------------------------------------------------------
 # Phenotype thresholds
 # ---------------------------------------------------------------------------
+@lru_cache(maxsize=256)
 def genetic_score_to_phenotype(gene: str, score: float) -> str:
     """Map a numeric activity score to a phenotype label."""
     if gene == "CYP2D6":
@@ -91,6 +102,8 @@ def genetic_score_to_phenotype(gene: str, score: float) -> str:
 # ---------------------------------------------------------------------------
 # Public API
 # ---------------------------------------------------------------------------
+# Pure function of (gene, diplotype) drawn from a small value set — memoized.
+@lru_cache(maxsize=4096)
 def calculate_genetic_activity_score(gene: str, diplotype: str) -> Optional[float]:
     """
     Split diplotype on "/" and sum allele activity values.
@@ -98,7 +111,7 @@ def calculate_genetic_activity_score(gene: str, diplotype: str) -> Optional[floa
     Handles CYP2D6 xN duplications: *1x3 means *1 × 3 copies.
     Returns None if the gene or diplotype is unrecognised.
     """
-    if not diplotype or diplotype in ("Unknown", ""):
+    if not diplotype or diplotype in _NO_DIPLOTYPE:
         return None
 
     allele_map = _GENE_MAP.get(gene)
@@ -121,9 +134,9 @@ def calculate_genetic_activity_score(gene: str, diplotype: str) -> Optional[floa
             except ValueError:
                 copy_mult = 1
 
-        val = allele_map.get(allele, None)
+        val = allele_map.get(allele)
         if val is None:
-            # Unknown allele — try looking up with just the star number
+            # Unknown spelling — retry upper-cased, else count as no function
             val = allele_map.get(allele.upper(), 0.0)
         total += val * copy_mult
 
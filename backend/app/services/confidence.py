@@ -6,11 +6,16 @@ Starts at 1.0 and applies deductions based on data quality indicators.
 from __future__ import annotations
 from typing import Any, Dict, List
 
+from app.services.cpic_engine import CpicDecision
+
+_GOOD_FILTER = frozenset(("PASS", ".", ""))
+_NO_CALL_METHODS = frozenset(("Unknown", ""))
+
 
 def calculate_confidence(
     gene_call: Dict[str, Any],
     variant_data: List[Dict[str, Any]],
-    cpic_result: Dict[str, Any],
+    cpic_result: CpicDecision,
     phenoconversion_occurred: bool = False,
 ) -> float:
     """
@@ -21,8 +26,8 @@ def calculate_confidence(
         Expected keys: calling_method, phenotype, has_structural_variant
     variant_data : list of dicts
         Detected variants for the gene. Each dict should have 'filter_status'.
-    cpic_result : dict
-        Result from lookup_cpic(). Expected key: risk_label
+    cpic_result : CpicDecision
+        Result from lookup_cpic()
     phenoconversion_occurred : bool
 
     Returns
@@ -34,10 +39,10 @@ def calculate_confidence(
     calling_method = gene_call.get("calling_method", "") or ""
     phenotype = gene_call.get("phenotype", "") or ""
     has_sv = bool(gene_call.get("has_structural_variant", False))
-    risk_label = cpic_result.get("risk_label", "") or ""
+    risk_label = cpic_result.risk_label or ""
 
     # Bad calling method
-    if calling_method in ("Unknown", "") or gene_call.get("error"):
+    if calling_method in _NO_CALL_METHODS or gene_call.get("error"):
         score -= 0.4
 
     # Unknown phenotype
@@ -50,8 +55,8 @@ def calculate_confidence(
 
     # Any variant failed quality filter
     any_failed = any(
-        (v.get("filter_status") or "PASS") not in ("PASS", ".", "")
-        for v in (variant_data or [])
+        (v.get("filter_status") or "PASS") not in _GOOD_FILTER
+        for v in (variant_data or ())
     )
     if any_failed:
         score -= 0.1
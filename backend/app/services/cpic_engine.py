@@ -6,7 +6,10 @@ dosing_recommendation, and alternative_drugs.
 The LLM NEVER modifies these values.
 """
 from __future__ import annotations
-from typing import Dict, Any, Tuple
+import sys
+from dataclasses import asdict, dataclass
+from functools import lru_cache
+from typing import Dict, Any, Optional, Tuple
 
 # ---------------------------------------------------------------------------
 # Decision table
@@ -206,10 +209,85 @@ DRUG_TO_GENE: Dict[str, str] = {
     "FLUOROURACIL": "DPYD",
 }
 
-SUPPORTED_DRUGS = list(DRUG_TO_GENE.keys())
+SUPPORTED_DRUGS: frozenset[str] = frozenset(DRUG_TO_GENE)
 
 
-def lookup_cpic(drug: str, clinical_phenotype: str) -> Dict[str, Any]:
-    """Return the CPIC decision dict for a (drug, phenotype) pair."""
-    key = (drug.upper(), clinical_phenotype)
-    return dict(CPIC_TABLE.get(key, _FALLBACK))
+@dataclass(frozen=True, slots=True)
+class CpicDecision:
+    """One immutable CPIC table row; instances are shared by every lookup."""
+    risk_label: str
+    severity: str
+    dosing: str
+    alternatives: Tuple[str, ...]
+    cpic_version: Optional[str]
+    evidence_level: Optional[str]
+
+    @classmethod
+    def from_row(cls, row: Dict[str, Any]) -> "CpicDecision":
+        return cls(
+            risk_label=row["risk_label"],
+            severity=row["severity"],
+            dosing=row["dosing"],
+            alternatives=tuple(row.get("alternatives") or ()),
+            cpic_version=row.get("cpic_version"),
+            evidence_level=row.get("evidence_level"),
+        )
+
+    def to_dict(self) -> Dict[str, Any]:
+        d = asdict(self)
+        d["alternatives"] = list(self.alternatives)
+        return d
+
+
+# Frozen rows shared by every lookup (the table never changes at runtime)
+_FROZEN_TABLE: Dict[Tuple[str, str], CpicDecision] = {
+    key: CpicDecision.from_row(row) for key, row in CPIC_TABLE.items()
+}
+_FROZEN_FALLBACK = CpicDecision.from_row(_FALLBACK)
+
+# Accepted long-form spellings for each table phenotype code
+_PHENOTYPE_ALIASES: Dict[str, Tuple[str, ...]] = {
+    "PM": ("Poor Metabolizer",),
+    "IM": ("Intermediate Metabolizer",),
+    "NM": ("Normal Metabolizer",),
+    "RM": ("Rapid Metabolizer",),
+    "UM": ("Ultrarapid Metabolizer", "URM"),
+}
+
+
+def _spellings(value: str) -> set[str]:
+    return {sys.intern(v) for v in (value, value.upper(), value.lower(), value.title())}
+
+
+def _build_lookup_index() -> Dict[Tuple[str, str], CpicDecision]:
+    """
+    (drug, phenotype) under every accepted casing/alias → the shared frozen
+    row, so the common lookup is a single dict hit with no normalisation.
+    """
+    index: Dict[Tuple[str, str], CpicDecision] = {}
+    for (drug, pheno), row in _FROZEN_TABLE.items():
+        phenos = set().union(*(_spellings(p) for p in (pheno, *_PHENOTYPE_ALIASES.get(pheno, ()))))
+        for d in _spellings(drug):
+            for p in phenos:
+                index[(d, p)] = row
+    return index
+
+
+_LOOKUP_INDEX = _build_lookup_index()
+
+
+# Safe to memoize: the returned decisions are immutable. Mostly spares the
+# upper-casing retry for spellings outside the index ("Unknown" phenotypes).
+@lru_cache(maxsize=256)
+def lookup_cpic(drug: str, clinical_phenotype: str) -> CpicDecision:
+    """Return the (immutable, shared) CPIC decision for a (drug, phenotype) pair."""
+    row = _LOOKUP_INDEX.get((drug, clinical_phenotype))
+    if row is None:
+        # Unusual casing of the drug name; phenotype spellings are all indexed
+        row = _LOOKUP_INDEX.get((drug.upper(), clinical_phenotype), _FROZEN_FALLBACK)
+    return row
+
+
+def lookup_cpic_mutable(drug: str, clinical_phenotype: str) -> Dict[str, Any]:
+    """Like lookup_cpic, but returns a private copy the caller may modify."""
+    return lookup_cpic(drug, clinical_phenotype).to_dict()
@@ -18,11 +18,15 @@ from __future__ import annotations
 
 import asyncio
 import hashlib
-import json
 import logging
+import sqlite3
+import threading
+from functools import lru_cache
 from typing import Any, Dict, List, Optional, Tuple
 
 import httpx
+import numpy as np
+import orjson
 
 from app.config import settings
 
@@ -87,8 +91,12 @@ def _embedding_model_name() -> str:
     return settings.OPENAI_EMBEDDING_MODEL
 
 
+@lru_cache(maxsize=1)
 def _make_sync_openai_client():
-    """Return synchronous openai client for embedding (ChromaDB uses sync)."""
+    """
+    Return the process-wide synchronous openai client for embedding
+    (ChromaDB uses sync). Built once so its connection pool is reused.
+    """
     import openai  # type: ignore
     if settings.OPENAI_API_TYPE.lower() == "azure":
         return openai.AzureOpenAI(
@@ -99,20 +107,106 @@ def _make_sync_openai_client():
     return openai.OpenAI(api_key=settings.OPENAI_API_KEY)
 
 
-def _embed_texts(texts: List[str]) -> List[List[float]]:
+def _make_async_openai_client():
+    """Return an async openai client for embedding."""
+    import openai  # type: ignore
+    if settings.OPENAI_API_TYPE.lower() == "azure":
+        return openai.AsyncAzureOpenAI(
+            azure_endpoint=settings.AZURE_OPENAI_ENDPOINT,
+            api_key=settings.AZURE_OPENAI_API_KEY,
+            api_version=settings.AZURE_OPENAI_API_VERSION,
+        )
+    return openai.AsyncOpenAI(api_key=settings.OPENAI_API_KEY)
+
+
+_EMBED_BATCH = 100          # API limit on inputs per request
+_EMBED_CONCURRENCY = 5      # in-flight requests, to respect provider rate limits
+
+
+def _embedding_key(model: str, text: str) -> bytes:
+    return hashlib.sha256(f"{model}\0{text}".encode()).digest()
+
+
+def _open_embedding_cache() -> Optional[sqlite3.Connection]:
+    """Open (creating if needed) the on-disk embedding cache; None if unusable."""
+    try:
+        conn = sqlite3.connect(settings.EMBEDDING_CACHE_PATH)
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS embeddings (key BLOB PRIMARY KEY, vec BLOB NOT NULL)"
+        )
+        return conn
+    except sqlite3.Error as exc:
+        logger.warning("Embedding cache unavailable (%s) — embedding everything.", exc)
+        return None
+
+
+def _load_cached_embeddings(keys: List[bytes]) -> Dict[bytes, np.ndarray]:
+    hits: Dict[bytes, np.ndarray] = {}
+    cache = _open_embedding_cache()
+    if cache is None:
+        return hits
+    try:
+        # Stay well under SQLite's bound-parameter limit
+        for i in range(0, len(keys), 500):
+            batch = keys[i : i + 500]
+            rows = cache.execute(
+                f"SELECT key, vec FROM embeddings WHERE key IN ({','.join('?' * len(batch))})",
+                batch,
+            )
+            for key, blob in rows:
+                hits[key] = np.frombuffer(blob, dtype=np.float32)
+    finally:
+        cache.close()
+    return hits
+
+
+def _store_cached_embeddings(rows: List[Tuple[bytes, bytes]]) -> None:
+    cache = _open_embedding_cache()
+    if cache is None:
+        return
+    try:
+        with cache:
+            cache.executemany("INSERT OR REPLACE INTO embeddings (key, vec) VALUES (?, ?)", rows)
+    finally:
+        cache.close()
+
+
+async def _embed_texts(texts: List[str]) -> np.ndarray:
     """
     Embed a list of texts using Azure OpenAI embeddings.
-    Returns list of float vectors. Falls back to None on error.
+    Vectors already in the on-disk cache are reused; misses are sent to the
+    API in concurrent batches and written back to the cache.
+    Returns a float32 array of shape (len(texts), dim).
     """
-    client = _make_sync_openai_client()
     model = _embedding_model_name()
-    # Batch in chunks of 100 (API limit)
-    all_embeddings: List[List[float]] = []
-    for i in range(0, len(texts), 100):
-        batch = texts[i : i + 100]
-        response = client.embeddings.create(model=model, input=batch)
-        all_embeddings.extend([d.embedding for d in response.data])
-    return all_embeddings
+    keys = [_embedding_key(model, t) for t in texts]
+    vectors = await asyncio.to_thread(_load_cached_embeddings, keys)
+    misses = [i for i, k in enumerate(keys) if k not in vectors]
+
+    if misses:
+        client = _make_async_openai_client()
+        sem = asyncio.Semaphore(_EMBED_CONCURRENCY)
+
+        async def _embed_batch(idx: List[int]) -> None:
+            async with sem:
+                response = await client.embeddings.create(
+                    model=model, input=[texts[i] for i in idx]
+                )
+            batch = np.asarray([d.embedding for d in response.data], dtype=np.float32)
+            for i, vec in zip(idx, batch):
+                vectors[keys[i]] = vec
+
+        await asyncio.gather(*(
+            _embed_batch(misses[start : start + _EMBED_BATCH])
+            for start in range(0, len(misses), _EMBED_BATCH)
+        ))
+        await asyncio.to_thread(
+            _store_cached_embeddings,
+            [(keys[i], vectors[keys[i]].tobytes()) for i in misses],
+        )
+
+    logger.info("Embeddings: %d cached, %d fetched", len(texts) - len(misses), len(misses))
+    return np.stack([vectors[k] for k in keys]) if keys else np.empty((0, 0), dtype=np.float32)
 
 
 # ---------------------------------------------------------------------------
@@ -120,9 +214,9 @@ def _embed_texts(texts: List[str]) -> List[List[float]]:
 # ---------------------------------------------------------------------------
 async def _fetch_json(client: httpx.AsyncClient, url: str, params: Optional[Dict] = None) -> Any:
     try:
-        resp = await client.get(url, params=params, timeout=30.0)
+        resp = await client.get(url, params=params)
         resp.raise_for_status()
-        return resp.json()
+        return orjson.loads(resp.content)
     except Exception as exc:
         logger.warning("CPIC API fetch failed for %s: %s", url, exc)
         return []
@@ -139,16 +233,17 @@ async def _fetch_recommendations(client: httpx.AsyncClient, guideline_id: int) -
     )
 
 
-async def _fetch_gene(client: httpx.AsyncClient, gene_symbol: str) -> Optional[Dict]:
+async def _fetch_genes(client: httpx.AsyncClient, gene_symbols: List[str]) -> Dict[str, Dict]:
+    """Fetch several genes in one request (PostgREST in.(...) filter), keyed by symbol."""
     rows = await _fetch_json(
         client,
         f"{CPIC_BASE}/gene",
         params={
-            "symbol": f"eq.{gene_symbol}",
+            "symbol": f"in.({','.join(gene_symbols)})",
             "select": "symbol,hgncid,ncbiid,lookupmethod,notesondiplotype,notesonallelenaming",
         },
     )
-    return rows[0] if rows else None
+    return {row["symbol"]: row for row in rows if row.get("symbol")}
 
 
 async def _fetch_drug(client: httpx.AsyncClient, drug_name: str) -> Optional[Dict]:
@@ -164,8 +259,8 @@ async def _fetch_drug(client: httpx.AsyncClient, drug_name: str) -> Optional[Dic
 # Chunk builders
 # ---------------------------------------------------------------------------
 def _chunk_id(text: str) -> str:
-    """Stable deterministic ID based on content hash."""
-    return hashlib.sha256(text.encode()).hexdigest()[:16]
+    """Stable deterministic ID based on content hash (64-bit BLAKE2b, 16 hex chars)."""
+    return hashlib.blake2b(text.encode(), digest_size=8).hexdigest()
 
 
 def _build_guideline_chunk(drug: str, meta: Dict) -> Tuple[str, str]:
@@ -184,28 +279,25 @@ def _build_guideline_chunk(drug: str, meta: Dict) -> Tuple[str, str]:
     return _chunk_id(text), text
 
 
+def _fmt_dict(d: Optional[Dict], empty: str = "N/A") -> str:
+    """Render a {gene: value} mapping as "G1: v1; G2: v2"."""
+    return "; ".join(f"{k}: {v}" for k, v in d.items()) if d else empty
+
+
 def _build_recommendation_chunk(drug: str, meta: Dict, rec: Dict) -> Tuple[str, str]:
     """One chunk per recommendation row."""
-    phenotypes = rec.get("phenotypes") or {}
-    implications = rec.get("implications") or {}
-    lookupkey = rec.get("lookupkey") or {}
     comments = rec.get("comments") or ""
-
-    pheno_str = "; ".join(f"{g}: {p}" for g, p in phenotypes.items()) if phenotypes else "N/A"
-    impl_str = "; ".join(f"{g}: {v}" for g, v in implications.items()) if implications else "N/A"
-    score_str = "; ".join(f"{g}: {s}" for g, s in lookupkey.items()) if lookupkey else "N/A"
-
-    text = (
-        f"CPIC Recommendation — Drug: {drug.upper()}\n"
-        f"Guideline: {meta['guideline_name']}\n"
-        f"Phenotype(s): {pheno_str}\n"
-        f"Activity Score(s): {score_str}\n"
-        f"Gene Impact: {impl_str}\n"
-        f"Classification: {rec.get('classification', 'Unknown')}\n"
-        f"Population: {rec.get('population', 'general')}\n"
-        f"Recommendation: {rec.get('drugrecommendation', '')}\n"
-        + (f"Additional notes: {comments}" if comments and comments.lower() != "n/a" else "")
-    )
+    text = "\n".join((
+        f"CPIC Recommendation — Drug: {drug.upper()}",
+        f"Guideline: {meta['guideline_name']}",
+        f"Phenotype(s): {_fmt_dict(rec.get('phenotypes'))}",
+        f"Activity Score(s): {_fmt_dict(rec.get('lookupkey'))}",
+        f"Gene Impact: {_fmt_dict(rec.get('implications'))}",
+        f"Classification: {rec.get('classification', 'Unknown')}",
+        f"Population: {rec.get('population', 'general')}",
+        f"Recommendation: {rec.get('drugrecommendation', '')}",
+        f"Additional notes: {comments}" if comments and comments.lower() != "n/a" else "",
+    ))
     return _chunk_id(text), text
 
 
@@ -238,8 +330,7 @@ def _build_phenotype_summary_chunk(drug: str, meta: Dict, recs: List[Dict]) -> T
     ]
     seen: set = set()
     for rec in recs:
-        phenotypes = rec.get("phenotypes") or {}
-        pheno_str = "; ".join(f"{g}: {p}" for g, p in phenotypes.items()) if phenotypes else "Unknown"
+        pheno_str = _fmt_dict(rec.get("phenotypes"), empty="Unknown")
         recom = rec.get("drugrecommendation", "")
         classif = rec.get("classification", "")
         key = pheno_str + recom
@@ -251,153 +342,394 @@ def _build_phenotype_summary_chunk(drug: str, meta: Dict, recs: List[Dict]) -> T
     return _chunk_id(text), text
 
 
+def _build_recommendation_chunks(
+    drug: str, meta: Dict, recs: List[Dict]
+) -> List[Tuple[Tuple[str, str], Dict]]:
+    """All recommendation chunks plus the phenotype summary for one drug, with metadata."""
+    genes = ",".join(meta["genes"])
+    out = []
+    for rec in recs:
+        pheno = "; ".join(rec.get("phenotypes", {}).values()) if rec.get("phenotypes") else "unknown"
+        out.append((_build_recommendation_chunk(drug, meta, rec), {
+            "drug": drug.upper(),
+            "type": "recommendation",
+            "phenotype": pheno,
+            "classification": rec.get("classification", ""),
+            "genes": genes,
+        }))
+    out.append((
+        _build_phenotype_summary_chunk(drug, meta, recs),
+        {"drug": drug.upper(), "type": "phenotype_summary", "genes": genes},
+    ))
+    return out
+
+
 # ---------------------------------------------------------------------------
 # ChromaDB upserter
 # ---------------------------------------------------------------------------
+_chroma_collection = None
+_chroma_lock = threading.Lock()
+
+
+def _make_chroma_client():
+    """
+    ChromaDB client for the configured transport: the remote HTTP server,
+    or an embedded on-disk instance that avoids a network hop per call.
+    """
+    import chromadb  # type: ignore
+
+    if settings.CHROMA_MODE.lower() == "embedded":
+        return chromadb.PersistentClient(path=settings.CHROMA_PATH)
+    return chromadb.HttpClient(host=settings.CHROMA_HOST, port=settings.CHROMA_PORT)
+
+
+def _get_chroma_collection():
+    """Connect and get-or-create the collection once; the handle is reused."""
+    global _chroma_collection
+    if _chroma_collection is None:
+        with _chroma_lock:
+            if _chroma_collection is None:
+                client = _make_chroma_client()
+                try:
+                    _chroma_collection = client.get_collection(settings.CHROMA_COLLECTION)
+                except Exception:
+                    _chroma_collection = client.create_collection(
+                        settings.CHROMA_COLLECTION,
+                        metadata={"hnsw:space": "cosine"},
+                    )
+    return _chroma_collection
+
+
 def _upsert_to_chroma(
     ids: List[str],
     texts: List[str],
-    embeddings: List[List[float]],
+    embeddings: np.ndarray,
     metadatas: List[Dict],
 ) -> None:
-    import chromadb  # type: ignore
-
-    client = chromadb.HttpClient(host=settings.CHROMA_HOST, port=settings.CHROMA_PORT)
-    try:
-        collection = client.get_collection(settings.CHROMA_COLLECTION)
-    except Exception:
-        collection = client.create_collection(
-            settings.CHROMA_COLLECTION,
-            metadata={"hnsw:space": "cosine"},
-        )
+    collection = _get_chroma_collection()
 
-    # Upsert in batches of 50
-    for i in range(0, len(ids), 50):
+    step = settings.CHROMA_UPSERT_BATCH
+    for i in range(0, len(ids), step):
         collection.upsert(
-            ids=ids[i : i + 50],
-            documents=texts[i : i + 50],
-            embeddings=embeddings[i : i + 50],
-            metadatas=metadatas[i : i + 50],
+            ids=ids[i : i + step],
+            documents=texts[i : i + step],
+            # chromadb 0.4 validates embeddings as lists of Python floats
+            embeddings=embeddings[i : i + step].tolist(),
+            metadatas=metadatas[i : i + step],
         )
     logger.info("ChromaDB upsert complete: %d chunks in '%s'", len(ids), settings.CHROMA_COLLECTION)
 
 
-def _collection_needs_refresh() -> bool:
-    """Return True if ChromaDB collection is absent or has fewer than 20 docs."""
+def _prune_stale_chunks(keep: set[str]) -> int:
+    """
+    Delete documents whose ids are not in `keep` (the ids of a complete
+    ingestion), e.g. chunks left behind by an older id scheme or by CPIC
+    data that has since changed. Returns the number deleted.
+    """
+    collection = _get_chroma_collection()
+    stale = [cid for cid in collection.get(include=[])["ids"] if cid not in keep]
+    step = settings.CHROMA_UPSERT_BATCH
+    for i in range(0, len(stale), step):
+        collection.delete(ids=stale[i : i + step])
+    return len(stale)
+
+
+def _upsert_concurrency() -> int:
+    """HttpClient upserts may overlap; an embedded client is driven from one thread at a time."""
+    return 1 if settings.CHROMA_MODE.lower() == "embedded" else 4
+
+
+def _collection_count() -> Optional[int]:
+    """Number of documents in the collection; None if ChromaDB is unavailable."""
     try:
-        import chromadb  # type: ignore
-        client = chromadb.HttpClient(host=settings.CHROMA_HOST, port=settings.CHROMA_PORT)
-        try:
-            col = client.get_collection(settings.CHROMA_COLLECTION)
-            count = col.count()
-            if count >= 20:
-                logger.info(
-                    "ChromaDB '%s' already has %d docs — skipping ingestion.",
-                    settings.CHROMA_COLLECTION, count,
-                )
-                return False
-        except Exception:
-            pass
-        return True
+        return _get_chroma_collection().count()
     except Exception:
-        return False
+        # chromadb missing or server unreachable
+        return None
 
 
 # ---------------------------------------------------------------------------
-# Main entry point
+# Ingestion fingerprint (skip re-ingesting unchanged CPIC data)
 # ---------------------------------------------------------------------------
-async def ingest_cpic_guidelines() -> None:
-    """
-    Fetch CPIC data for all supported drugs, build text chunks,
-    embed them, and upsert into ChromaDB.
+# Bump when chunk text/ids/metadata change shape so the next start re-ingests.
+_CHUNK_FORMAT_VERSION = 2
 
-    Runs at application startup. Skips if:
-      - ChromaDB is unreachable
-      - openai package is missing
-      - Collection already has ≥20 documents (already seeded)
-    """
-    if not _collection_needs_refresh():
+
+def _ingest_target() -> str:
+    """Identifies the Chroma collection the stored fingerprint applies to."""
+    if settings.CHROMA_MODE.lower() == "embedded":
+        return f"embedded:{settings.CHROMA_PATH}:{settings.CHROMA_COLLECTION}"
+    return f"http:{settings.CHROMA_HOST}:{settings.CHROMA_PORT}:{settings.CHROMA_COLLECTION}"
+
+
+def _ingest_fingerprint(recs_by_drug: Dict[str, List[Dict]], genes: Dict[str, Dict]) -> str:
+    return hashlib.sha256(orjson.dumps(
+        {
+            "format": _CHUNK_FORMAT_VERSION,
+            "model": _embedding_model_name(),
+            "guidelines": DRUG_GUIDELINE_MAP,
+            "recs": recs_by_drug,
+            "genes": genes,
+        },
+        option=orjson.OPT_SORT_KEYS,
+    )).hexdigest()
+
+
+def _load_ingest_state() -> Optional[Tuple[str, int]]:
+    """(fingerprint, chunk count) of the last complete ingestion, if recorded."""
+    cache = _open_embedding_cache()
+    if cache is None:
+        return None
+    try:
+        cache.execute(
+            "CREATE TABLE IF NOT EXISTS ingest_state "
+            "(target TEXT PRIMARY KEY, fingerprint TEXT NOT NULL, chunks INTEGER NOT NULL)"
+        )
+        row = cache.execute(
+            "SELECT fingerprint, chunks FROM ingest_state WHERE target = ?", (_ingest_target(),)
+        ).fetchone()
+        return (row[0], row[1]) if row else None
+    finally:
+        cache.close()
+
+
+def _save_ingest_state(fingerprint: str, chunks: int) -> None:
+    cache = _open_embedding_cache()
+    if cache is None:
         return
+    try:
+        with cache:
+            cache.execute(
+                "CREATE TABLE IF NOT EXISTS ingest_state "
+                "(target TEXT PRIMARY KEY, fingerprint TEXT NOT NULL, chunks INTEGER NOT NULL)"
+            )
+            cache.execute(
+                "INSERT OR REPLACE INTO ingest_state (target, fingerprint, chunks) VALUES (?, ?, ?)",
+                (_ingest_target(), fingerprint, chunks),
+            )
+    finally:
+        cache.close()
 
-    logger.info("Starting CPIC guideline ingestion into ChromaDB…")
 
-    all_ids: List[str] = []
-    all_texts: List[str] = []
-    all_metadatas: List[Dict] = []
+# ---------------------------------------------------------------------------
+# Main entry point
+# ---------------------------------------------------------------------------
+_INGEST_WINDOW = 500        # chunks embedded + upserted together
+_INGEST_QUEUE_SIZE = 1000
+
+# (chunk_id, text, metadata); None marks the end of production
+_Chunk = Tuple[str, str, Dict]
+
 
-    # Track which genes we've already fetched
-    fetched_genes: Dict[str, Dict] = {}
+def _map_genes_to_drugs() -> Dict[str, List[str]]:
     gene_to_drugs: Dict[str, List[str]] = {}
+    for drug, meta in DRUG_GUIDELINE_MAP.items():
+        for gene in meta["genes"]:
+            gene_to_drugs.setdefault(gene, []).append(drug)
+    return gene_to_drugs
 
-    async with httpx.AsyncClient() as client:
-        for drug, meta in DRUG_GUIDELINE_MAP.items():
-            logger.info("  → Fetching CPIC data for %s (guideline %d)…", drug.upper(), meta["guideline_id"])
 
+# Gene → drugs whose guideline uses it (static, from DRUG_GUIDELINE_MAP)
+_GENE_TO_DRUGS = _map_genes_to_drugs()
+
+
+async def _fetch_cpic_data() -> Tuple[Dict[str, List[Dict]], Dict[str, Dict]]:
+    """
+    Fetch every drug's recommendations and all genes concurrently.
+    Returns (recommendations by drug, gene rows by symbol).
+    """
+    async with httpx.AsyncClient(
+        http2=True,
+        limits=httpx.Limits(max_connections=16, max_keepalive_connections=16, keepalive_expiry=30),
+        timeout=httpx.Timeout(30.0, connect=5.0),
+    ) as client:
+        recs_list, genes = await asyncio.gather(
+            asyncio.gather(*(
+                _fetch_recommendations(client, meta["guideline_id"])
+                for meta in DRUG_GUIDELINE_MAP.values()
+            )),
+            _fetch_genes(client, list(_GENE_TO_DRUGS)),
+        )
+    recs_by_drug = dict(zip(DRUG_GUIDELINE_MAP, recs_list))
+    logger.info(
+        "CPIC fetch: %s recommendations; %d/%d genes",
+        ", ".join(f"{drug.upper()}={len(recs)}" for drug, recs in recs_by_drug.items()),
+        len(genes), len(_GENE_TO_DRUGS),
+    )
+    if logger.isEnabledFor(logging.DEBUG):
+        for drug, recs in recs_by_drug.items():
+            logger.debug(
+                "  → %s (guideline %d): %d recommendations fetched",
+                drug.upper(), DRUG_GUIDELINE_MAP[drug]["guideline_id"], len(recs),
+            )
+    return recs_by_drug, genes
+
+
+async def _produce_chunks(
+    queue: "asyncio.Queue[Optional[_Chunk]]",
+    recs_by_drug: Dict[str, List[Dict]],
+    genes: Dict[str, Dict],
+) -> set[str]:
+    """
+    Build chunks from the fetched CPIC data and enqueue each as soon as it
+    is ready; identical chunks (same content-hash id) are enqueued once.
+    Returns the ids of the chunks enqueued.
+    """
+    seen: set[str] = set()
+
+    async def emit(chunk: Tuple[str, str], metadata: Dict) -> None:
+        cid, text = chunk
+        if cid not in seen:
+            seen.add(cid)
+            await queue.put((cid, text, metadata))
+
+    try:
+        for drug, meta in DRUG_GUIDELINE_MAP.items():
             # 1. Guideline overview chunk
-            cid, text = _build_guideline_chunk(drug, meta)
-            all_ids.append(cid)
-            all_texts.append(text)
-            all_metadatas.append({"drug": drug.upper(), "type": "guideline", "genes": ",".join(meta["genes"])})
-
-            # 2. Fetch recommendations
-            recs = await _fetch_recommendations(client, meta["guideline_id"])
-            logger.info("     %d recommendations fetched", len(recs))
-
-            for rec in recs:
-                cid, text = _build_recommendation_chunk(drug, meta, rec)
-                all_ids.append(cid)
-                all_texts.append(text)
-                pheno = "; ".join(rec.get("phenotypes", {}).values()) if rec.get("phenotypes") else "unknown"
-                all_metadatas.append({
-                    "drug": drug.upper(),
-                    "type": "recommendation",
-                    "phenotype": pheno,
-                    "classification": rec.get("classification", ""),
-                    "genes": ",".join(meta["genes"]),
+            await emit(
+                _build_guideline_chunk(drug, meta),
+                {"drug": drug.upper(), "type": "guideline", "genes": ",".join(meta["genes"])},
+            )
+            # 2. One chunk per recommendation + 3. phenotype summary (off the event loop)
+            built = await asyncio.to_thread(
+                _build_recommendation_chunks, drug, meta, recs_by_drug.get(drug, [])
+            )
+            for chunk, metadata in built:
+                await emit(chunk, metadata)
+
+        # 4. One chunk per unique gene
+        for gene, drugs_using in _GENE_TO_DRUGS.items():
+            gene_data = genes.get(gene)
+            if gene_data:
+                await emit(_build_gene_chunk(gene, gene_data, drugs_using), {
+                    "type": "gene",
+                    "gene": gene,
+                    "drugs": ",".join(d.upper() for d in drugs_using),
                 })
+    finally:
+        await queue.put(None)
+    return seen
+
 
-            # 3. Phenotype summary chunk
-            cid, text = _build_phenotype_summary_chunk(drug, meta, recs)
-            all_ids.append(cid)
-            all_texts.append(text)
-            all_metadatas.append({"drug": drug.upper(), "type": "phenotype_summary", "genes": ",".join(meta["genes"])})
-
-            # 4. Track genes for gene chunks
-            for gene in meta["genes"]:
-                gene_to_drugs.setdefault(gene, []).append(drug)
-                if gene not in fetched_genes:
-                    gene_data = await _fetch_gene(client, gene)
-                    if gene_data:
-                        fetched_genes[gene] = gene_data
-
-    # 5. Gene chunks (one per unique gene)
-    for gene, gene_data in fetched_genes.items():
-        drugs_using = gene_to_drugs.get(gene, [])
-        cid, text = _build_gene_chunk(gene, gene_data, drugs_using)
-        all_ids.append(cid)
-        all_texts.append(text)
-        all_metadatas.append({
-            "type": "gene",
-            "gene": gene,
-            "drugs": ",".join(d.upper() for d in drugs_using),
-        })
-
-    logger.info("Total chunks to embed: %d", len(all_texts))
-
-    # 6. Embed all chunks
+async def _consume_chunks(queue: "asyncio.Queue[Optional[_Chunk]]") -> int:
+    """
+    Embed queued chunks in windows of up to _INGEST_WINDOW, taking whatever
+    is ready rather than waiting for a full window. Each window's upsert runs
+    in the background (up to _upsert_concurrency() at once) while the next
+    window is embedded. After a failure the queue is still drained so the
+    producer never blocks. Returns the number of chunks stored.
+    """
+    sem = asyncio.Semaphore(_upsert_concurrency())
+
+    async def upsert(ids: List[str], texts: List[str], embeddings: np.ndarray, metadatas: List[Dict]) -> int:
+        async with sem:
+            await asyncio.to_thread(_upsert_to_chroma, ids, texts, embeddings, metadatas)
+        return len(ids)
+
+    upserts: List[asyncio.Task] = []
+    failed = False
+    done = False
+    while not done:
+        window = [await queue.get()]
+        while len(window) < _INGEST_WINDOW and not queue.empty():
+            window.append(queue.get_nowait())
+        if window[-1] is None:
+            window.pop()
+            done = True
+        failed = failed or any(t.done() and t.exception() for t in upserts)
+        if not window or failed:
+            continue
+
+        ids, texts, metadatas = (list(col) for col in zip(*window))
+        try:
+            embeddings = await _embed_texts(texts)
+        except Exception as exc:
+            logger.error("Embedding failed: %s — RAG ingestion aborted.", exc)
+            failed = True
+            continue
+        upserts.append(asyncio.create_task(upsert(ids, texts, embeddings, metadatas)))
+
+    stored = 0
+    for outcome in await asyncio.gather(*upserts, return_exceptions=True):
+        if isinstance(outcome, Exception):
+            logger.error("ChromaDB upsert failed: %s", outcome)
+        else:
+            stored += outcome
+    return stored
+
+
+def _warmup_sync() -> None:
     try:
-        embeddings = await asyncio.get_event_loop().run_in_executor(
-            None, _embed_texts, all_texts
+        _make_sync_openai_client().embeddings.create(
+            model=_embedding_model_name(), input=["warmup"]
         )
     except Exception as exc:
-        logger.error("Embedding failed: %s — RAG ingestion aborted.", exc)
+        logger.warning("Embedding provider warm-up failed (non-fatal): %s", exc)
+    try:
+        _get_chroma_collection().count()
+    except Exception as exc:
+        logger.warning("ChromaDB warm-up failed (non-fatal): %s", exc)
+
+
+async def warmup() -> None:
+    """
+    Initialise the embedding client and ChromaDB handle and make one cheap
+    call through each, so the first RAG query doesn't pay for client setup
+    and TLS handshakes. Runs at startup whether or not ingestion is needed.
+    """
+    await asyncio.to_thread(_warmup_sync)
+
+
+async def ingest_cpic_guidelines() -> None:
+    """
+    Fetch CPIC data for all supported drugs, build text chunks,
+    embed them, and upsert into ChromaDB.
+
+    Chunks flow through a bounded queue: they are embedded and upserted in
+    windows while later chunks are still being built. After a complete run,
+    documents not produced by it are deleted from the collection.
+
+    Runs at application startup. Skips if:
+      - ChromaDB is unreachable
+      - openai package is missing
+      - the fetched CPIC data hashes to the fingerprint of the last complete
+        ingestion into this collection (and the collection still holds it)
+      - the CPIC API returned nothing and the collection is already seeded
+    """
+    count = await asyncio.to_thread(_collection_count)
+    if count is None:
         return
 
-    # 7. Upsert into ChromaDB
-    try:
-        await asyncio.get_event_loop().run_in_executor(
-            None, _upsert_to_chroma, all_ids, all_texts, embeddings, all_metadatas
+    recs_by_drug, genes = await _fetch_cpic_data()
+    if count and not any(recs_by_drug.values()):
+        logger.warning("CPIC API returned no recommendations — keeping the existing collection.")
+        return
+
+    fingerprint = _ingest_fingerprint(recs_by_drug, genes)
+    state = await asyncio.to_thread(_load_ingest_state)
+    if state and state[0] == fingerprint and count >= state[1]:
+        logger.info(
+            "CPIC data unchanged since last ingestion — '%s' (%d docs) is current.",
+            settings.CHROMA_COLLECTION, count,
         )
-        logger.info("✅ CPIC RAG ingestion complete — %d chunks stored.", len(all_ids))
-    except Exception as exc:
-        logger.error("ChromaDB upsert failed: %s", exc)
+        return
+
+    logger.info("Starting CPIC guideline ingestion into ChromaDB…")
+
+    queue: "asyncio.Queue[Optional[_Chunk]]" = asyncio.Queue(maxsize=_INGEST_QUEUE_SIZE)
+    produced, stored = await asyncio.gather(
+        _produce_chunks(queue, recs_by_drug, genes), _consume_chunks(queue)
+    )
+    if stored:
+        logger.info("✅ CPIC RAG ingestion complete — %d chunks stored.", stored)
+    if stored == len(produced):
+        # Only after a complete run, so a partial one never loses the old copy
+        if count:
+            try:
+                pruned = await asyncio.to_thread(_prune_stale_chunks, produced)
+            except Exception as exc:
+                logger.error("Pruning stale CPIC chunks failed: %s", exc)
+                return
+            if pruned:
+                logger.info("Removed %d stale chunks from '%s'.", pruned, settings.CHROMA_COLLECTION)
+        await asyncio.to_thread(_save_ingest_state, fingerprint, stored)
@@ -12,24 +12,40 @@ Configure via app/config.py or .env:
   AZURE_OPENAI_DEPLOYMENT=gpt-5                 # deployment name in Azure
 """
 from __future__ import annotations
+import asyncio
+import hashlib
 import logging
+import re
+import string
 import time
 import uuid
+from dataclasses import dataclass
 from datetime import datetime, timezone
-from typing import Any, Dict, List, Optional
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Tuple
 
+import httpx
+from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.config import settings
-from app.models.llm_explanation import LLMExplanation
+from app.database import AsyncSessionLocal, uuid7
+from app.models.explanation_cache import ExplanationCache
+from app.models.llm_explanation import LLMExplanation, pack_context_chunks
 
 logger = logging.getLogger(__name__)
 
 # ---------------------------------------------------------------------------
 # Build the OpenAI client (Azure OR standard OpenAI)
 # ---------------------------------------------------------------------------
+@lru_cache(maxsize=1)
 def _make_client():
-    """Return an openai.AsyncAzureOpenAI or openai.AsyncOpenAI client."""
+    """
+    Return the process-wide openai.AsyncAzureOpenAI or openai.AsyncOpenAI
+    client. Built once so its HTTP/2 keep-alive pool is shared by every
+    explanation instead of paying DNS + TLS setup per call.
+    """
     try:
         import openai  # type: ignore
     except ImportError as exc:
@@ -37,14 +53,97 @@ def _make_client():
             "openai package not installed. Run: pip install openai"
         ) from exc
 
+    http_client = openai.DefaultAsyncHttpxClient(
+        http2=True,
+        limits=httpx.Limits(max_connections=1000, max_keepalive_connections=200),
+    )
     if settings.OPENAI_API_TYPE.lower() == "azure":
         return openai.AsyncAzureOpenAI(
             azure_endpoint=settings.AZURE_OPENAI_ENDPOINT,
             api_key=settings.AZURE_OPENAI_API_KEY,
             api_version=settings.AZURE_OPENAI_API_VERSION,
+            http_client=http_client,
+            max_retries=3,
         )
     else:
-        return openai.AsyncOpenAI(api_key=settings.OPENAI_API_KEY)
+        return openai.AsyncOpenAI(
+            api_key=settings.OPENAI_API_KEY, http_client=http_client, max_retries=3
+        )
+
+
+class _TokenBucket:
+    """
+    Async token bucket: holds up to `rate` units, refilled continuously at
+    `rate` per minute. acquire() waits until the requested amount is free.
+    A non-positive rate disables the limit.
+    """
+
+    def __init__(self, rate: int) -> None:
+        self._capacity = float(rate)
+        self._level = float(rate)
+        self._per_sec = rate / 60.0
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self, amount: float = 1.0) -> None:
+        if self._capacity <= 0:
+            return
+        amount = min(amount, self._capacity)
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self._level = min(self._capacity, self._level + (now - self._updated) * self._per_sec)
+                self._updated = now
+                if self._level >= amount:
+                    self._level -= amount
+                    return
+                await asyncio.sleep((amount - self._level) / self._per_sec)
+
+
+_MAX_COMPLETION_TOKENS = 800
+
+# Requests and tokens per minute, so bursts queue here instead of hitting 429s
+_RPM_LIMITER = _TokenBucket(settings.LLM_RPM)
+_TPM_LIMITER = _TokenBucket(settings.LLM_TPM)
+
+
+@lru_cache(maxsize=1)
+def _encoding():
+    """tiktoken encoding for the configured model, or None without tiktoken."""
+    try:
+        import tiktoken  # type: ignore
+    except ImportError:
+        return None
+    try:
+        return tiktoken.encoding_for_model(_model_name())
+    except KeyError:
+        # Azure deployment names are not model names
+        return tiktoken.get_encoding("o200k_base")
+
+
+def _count_tokens(messages: List[Dict[str, str]]) -> int:
+    enc = _encoding()
+    if enc is None:
+        # ~4 characters per token is close enough for budgeting
+        return sum(len(m["content"]) for m in messages) // 4
+    return sum(len(enc.encode(m["content"])) for m in messages)
+
+
+def _completion_budget(prompt_tokens: int) -> int:
+    """Completion cap that keeps prompt + completion inside the context window."""
+    return max(1, min(_MAX_COMPLETION_TOKENS, settings.LLM_CONTEXT_WINDOW - prompt_tokens - 64))
+
+
+async def _throttle(tokens: int) -> None:
+    await _RPM_LIMITER.acquire()
+    await _TPM_LIMITER.acquire(tokens)
+
+
+async def close_client() -> None:
+    """Close the shared client's connection pool, if it was ever built."""
+    if _make_client.cache_info().currsize:
+        await _make_client().close()
+        _make_client.cache_clear()
 
 
 def _model_name() -> str:
@@ -57,6 +156,35 @@ def _model_name() -> str:
 # ---------------------------------------------------------------------------
 # ChromaDB RAG helper  (semantic search via embeddings)
 # ---------------------------------------------------------------------------
+@lru_cache(maxsize=1024)
+def _embed_query(model: str, query: str) -> Tuple[float, ...]:
+    """
+    Embed a RAG query, memoized per (model, query) in-process and backed by
+    the on-disk embedding cache shared with ingestion, so repeated
+    drug/gene/phenotype queries skip the embeddings API entirely.
+    """
+    import numpy as np
+    from app.services.cpic_ingestion import (
+        _embedding_key,
+        _load_cached_embeddings,
+        _make_sync_openai_client,
+        _store_cached_embeddings,
+    )
+
+    key = _embedding_key(model, query)
+    cached = _load_cached_embeddings([key]).get(key)
+    if cached is not None:
+        return tuple(cached.tolist())
+
+    embed_resp = _make_sync_openai_client().embeddings.create(model=model, input=[query])
+    vector = embed_resp.data[0].embedding
+    _store_cached_embeddings([(key, np.asarray(vector, dtype=np.float32).tobytes())])
+    return tuple(vector)
+
+
+_RAG_TOP_K = 5
+
+
 def _rag_retrieve(drug: str, clinical_phenotype: str, gene: str) -> List[str]:
     """
     Embed the query and do a cosine-similarity search against the
@@ -65,8 +193,7 @@ def _rag_retrieve(drug: str, clinical_phenotype: str, gene: str) -> List[str]:
     Falls back to empty list if ChromaDB or embeddings are unavailable.
     """
     try:
-        import chromadb  # type: ignore
-        from app.services.cpic_ingestion import _make_sync_openai_client, _embedding_model_name
+        from app.services.cpic_ingestion import _embedding_model_name, _get_chroma_collection
 
         # Build a rich query that captures the clinical context
         query = (
@@ -74,41 +201,31 @@ def _rag_retrieve(drug: str, clinical_phenotype: str, gene: str) -> List[str]:
             f"dosing recommendation phenoconversion CPIC"
         )
 
-        # Embed the query
-        oa_client = _make_sync_openai_client()
-        embed_resp = oa_client.embeddings.create(
-            model=_embedding_model_name(),
-            input=[query],
-        )
-        query_embedding = embed_resp.data[0].embedding
-
-        # Query ChromaDB with vector + optional drug filter
-        chroma_client = chromadb.HttpClient(
-            host=settings.CHROMA_HOST,
-            port=settings.CHROMA_PORT,
-        )
-        collection = chroma_client.get_collection(settings.CHROMA_COLLECTION)
+        # Embed the query (cached)
+        query_embedding = list(_embed_query(_embedding_model_name(), query))
 
-        # Try drug-filtered search first (more relevant)
+        # Drug-filtered search first (more relevant); the unfiltered query
+        # only runs when no chunk is tagged with this drug
+        collection = _get_chroma_collection()
         try:
             results = collection.query(
                 query_embeddings=[query_embedding],
-                n_results=5,
+                n_results=_RAG_TOP_K,
                 where={"drug": drug.upper()},
+                include=["documents"],
             )
-            docs = results.get("documents", [[]])[0]
+            docs = (results.get("documents") or [[]])[0]
             if docs:
                 return docs
         except Exception:
             pass
 
-        # Fall back to unfiltered search
         results = collection.query(
             query_embeddings=[query_embedding],
-            n_results=5,
+            n_results=_RAG_TOP_K,
+            include=["documents"],
         )
-        docs = results.get("documents", [[]])[0]
-        return docs if docs else []
+        return (results.get("documents") or [[]])[0] or []
 
     except Exception as exc:
         logger.warning("RAG retrieval failed (non-fatal): %s", exc)
@@ -118,6 +235,57 @@ def _rag_retrieve(drug: str, clinical_phenotype: str, gene: str) -> List[str]:
 # ---------------------------------------------------------------------------
 # Prompt builder
 # ---------------------------------------------------------------------------
+_SYSTEM_PROMPT = (
+    "You are PharmaGuard AI, a Clinical Pharmacogenomics assistant. "
+    "You explain drug-gene interactions to healthcare providers. "
+    "Use the provided CPIC guideline excerpts if available. If no specific guidelines are provided, "
+    "rely strictly on standard, established clinical pharmacological knowledge for the drug/gene interaction. "
+    "Do not refuse to answer; provide a helpful, scientifically grounded summary. "
+    "Never recommend a specific prescription decision. "
+    "Use language like \"Guidelines or standard evidence suggest considering...\"."
+)
+
+_USER_TEMPLATE = string.Template("""CONTEXT (Retrieved CPIC Guidelines):
+$context_text
+
+PATIENT DATA:
+- Gene: $gene
+- Diplotype: $diplotype
+- Genetic Phenotype: $genetic_phenotype
+- Clinical Phenotype (after phenoconversion): $clinical_phenotype
+- Drug: $drug_name
+- Risk Label: $risk_label
+- Phenoconversion occurred: $phenoconversion_occurred ($inhibitor_note)
+
+Generate a clinical explanation with exactly these four sections:
+1. SUMMARY: 1-2 sentence high-level alert for a clinician.
+2. MECHANISM: Explain the biological reason why this drug-gene combination produces this risk.
+3. GUIDELINE: State what the CPIC/FDA guideline recommends (or standard clinical practice if no excerpts provided).
+4. PHENOCONVERSION NOTE: If phenoconversion occurred, explain how $inhibitor_name changed the effective phenotype. If not, write "Not applicable."
+""")
+
+
+def _fit_context(chunks: List[str], budget: int) -> List[str]:
+    """Drop repeated chunks and stop once `budget` characters are used."""
+    kept: List[str] = []
+    seen: set[str] = set()
+    used = 0
+    for chunk in chunks:
+        if chunk in seen:
+            continue
+        seen.add(chunk)
+        room = budget - used
+        if room <= 0:
+            break
+        if len(chunk) > room:
+            if kept:
+                break
+            chunk = chunk[:room]  # a lone oversized chunk is truncated, not dropped
+        kept.append(chunk)
+        used += len(chunk)
+    return kept
+
+
 def _build_messages(
     context_chunks: List[str],
     gene: str,
@@ -129,42 +297,27 @@ def _build_messages(
     phenoconversion_occurred: bool,
     active_inhibitor: Optional[str],
 ) -> List[Dict[str, str]]:
+    context_chunks = _fit_context(context_chunks, settings.LLM_CONTEXT_BUDGET_CHARS)
     context_text = "\n\n".join(context_chunks) if context_chunks else "No guideline excerpts available."
     inhibitor_note = (
         f"active inhibitor: {active_inhibitor}" if active_inhibitor else "no active inhibitors"
     )
 
-    system_prompt = (
-        "You are PharmaGuard AI, a Clinical Pharmacogenomics assistant. "
-        "You explain drug-gene interactions to healthcare providers. "
-        "Use the provided CPIC guideline excerpts if available. If no specific guidelines are provided, "
-        "rely strictly on standard, established clinical pharmacological knowledge for the drug/gene interaction. "
-        "Do not refuse to answer; provide a helpful, scientifically grounded summary. "
-        "Never recommend a specific prescription decision. "
-        "Use language like \"Guidelines or standard evidence suggest considering...\"."
+    user_prompt = _USER_TEMPLATE.substitute(
+        context_text=context_text,
+        gene=gene,
+        diplotype=diplotype,
+        genetic_phenotype=genetic_phenotype,
+        clinical_phenotype=clinical_phenotype,
+        drug_name=drug_name,
+        risk_label=risk_label,
+        phenoconversion_occurred=phenoconversion_occurred,
+        inhibitor_note=inhibitor_note,
+        inhibitor_name=active_inhibitor or "the inhibitor",
     )
 
-    user_prompt = f"""CONTEXT (Retrieved CPIC Guidelines):
-{context_text}
-
-PATIENT DATA:
-- Gene: {gene}
-- Diplotype: {diplotype}
-- Genetic Phenotype: {genetic_phenotype}
-- Clinical Phenotype (after phenoconversion): {clinical_phenotype}
-- Drug: {drug_name}
-- Risk Label: {risk_label}
-- Phenoconversion occurred: {phenoconversion_occurred} ({inhibitor_note})
-
-Generate a clinical explanation with exactly these four sections:
-1. SUMMARY: 1-2 sentence high-level alert for a clinician.
-2. MECHANISM: Explain the biological reason why this drug-gene combination produces this risk.
-3. GUIDELINE: State what the CPIC/FDA guideline recommends (or standard clinical practice if no excerpts provided).
-4. PHENOCONVERSION NOTE: If phenoconversion occurred, explain how {active_inhibitor or 'the inhibitor'} changed the effective phenotype. If not, write "Not applicable."
-"""
-
     return [
-        {"role": "system", "content": system_prompt},
+        {"role": "system", "content": _SYSTEM_PROMPT},
         {"role": "user", "content": user_prompt},
     ]
 
@@ -172,6 +325,15 @@ Generate a clinical explanation with exactly these four sections:
 # ---------------------------------------------------------------------------
 # Response parser
 # ---------------------------------------------------------------------------
+_SECTION_RE = re.compile(r"(SUMMARY|MECHANISM|GUIDELINE|PHENOCONVERSION NOTE):", re.IGNORECASE)
+_SECTION_KEYS = {
+    "SUMMARY": "summary",
+    "MECHANISM": "mechanism",
+    "GUIDELINE": "guideline",
+    "PHENOCONVERSION NOTE": "phenoconversion_note",
+}
+
+
 def _parse_llm_response(text: str) -> Dict[str, str]:
     sections: Dict[str, str] = {
         "summary": "",
@@ -179,34 +341,164 @@ def _parse_llm_response(text: str) -> Dict[str, str]:
         "guideline": "",
         "phenoconversion_note": "",
     }
-    markers = [
-        ("SUMMARY:", "summary"),
-        ("MECHANISM:", "mechanism"),
-        ("GUIDELINE:", "guideline"),
-        ("PHENOCONVERSION NOTE:", "phenoconversion_note"),
-    ]
-    remaining = text
-    for i, (marker, key) in enumerate(markers):
-        upper = remaining.upper()
-        idx = upper.find(marker)
-        if idx == -1:
+    # One scan for every marker; each section runs to the next marker
+    matches = list(_SECTION_RE.finditer(text))
+    for i, m in enumerate(matches):
+        key = _SECTION_KEYS[m.group(1).upper()]
+        if sections[key]:
             continue
-        start = idx + len(marker)
-        next_idx = len(remaining)
-        for j, (next_marker, _) in enumerate(markers):
-            if j <= i:
-                continue
-            ni = upper.find(next_marker, start)
-            if ni != -1 and ni < next_idx:
-                next_idx = ni
-        sections[key] = remaining[start:next_idx].strip()
-        remaining = remaining[next_idx:]
+        end = matches[i + 1].start() if i + 1 < len(matches) else len(text)
+        sections[key] = text[m.end():end].strip()
     return sections
 
 
+# ---------------------------------------------------------------------------
+# Explanation cache
+# ---------------------------------------------------------------------------
+def _explanation_cache_key(
+    model_used: str,
+    drug_name: str,
+    gene: str,
+    diplotype: str,
+    genetic_phenotype: str,
+    clinical_phenotype: str,
+    risk_label: str,
+    phenoconversion_occurred: bool,
+    active_inhibitor: Optional[str],
+) -> str:
+    # Every field that reaches the prompt, so cached text never names
+    # another patient's genotype
+    parts = (
+        model_used, drug_name.upper(), gene, diplotype, genetic_phenotype,
+        clinical_phenotype, risk_label, str(phenoconversion_occurred),
+        active_inhibitor or "",
+    )
+    return hashlib.sha256("|".join(parts).encode()).hexdigest()
+
+
+async def _generate(
+    job: ExplainJob,
+    chunks: List[str],
+    model_used: str,
+) -> Tuple[LLMExplanation, Optional[Dict[str, Any]]]:
+    """
+    Build the prompt, call the LLM and parse its sections for one job.
+    Returns the unsaved record and, when the call succeeded, the
+    explanation-cache row for it.
+    """
+    # Step 2 — Build chat messages
+    messages = _build_messages(
+        context_chunks=chunks,
+        gene=job.gene,
+        diplotype=job.diplotype or "Unknown",
+        genetic_phenotype=job.genetic_phenotype or "Unknown",
+        clinical_phenotype=job.clinical_phenotype or "Unknown",
+        drug_name=job.drug_name,
+        risk_label=job.risk_label or "Unknown",
+        phenoconversion_occurred=job.phenoconversion_occurred,
+        active_inhibitor=job.active_inhibitor,
+    )
+
+    # Step 3 — Call LLM via OpenAI SDK
+    raw_text = ""
+    prompt_tokens: Optional[int] = None
+    completion_tokens: Optional[int] = None
+    generation_time_ms: int = 0
+    llm_ok = False
+
+    t0 = time.time()
+    try:
+        client = _make_client()
+        prompt_estimate = _count_tokens(messages)
+        budget = _completion_budget(prompt_estimate)
+        await _throttle(prompt_estimate + budget)
+        stream = await client.chat.completions.create(
+            model=_model_name(),
+            messages=messages,  # type: ignore[arg-type]
+            max_completion_tokens=budget,
+            stream=True,
+            stream_options={"include_usage": True},
+        )
+        parts: List[str] = []
+        async for chunk in stream:
+            if chunk.choices and chunk.choices[0].delta.content:
+                parts.append(chunk.choices[0].delta.content)
+            if chunk.usage:
+                prompt_tokens = chunk.usage.prompt_tokens
+                completion_tokens = chunk.usage.completion_tokens
+        generation_time_ms = int((time.time() - t0) * 1000)
+        raw_text = "".join(parts)
+        llm_ok = bool(raw_text)
+    except Exception as exc:
+        generation_time_ms = int((time.time() - t0) * 1000)
+        raw_text = f"LLM unavailable: {exc}"
+
+    # Step 4 — Parse sections
+    parsed = _parse_llm_response(raw_text)
+
+    record = LLMExplanation(
+        id=uuid7(),
+        risk_analysis_id=job.risk_analysis_id,
+        summary=parsed["summary"] or raw_text[:500],
+        mechanism_explanation=parsed["mechanism"],
+        guideline_quote=parsed["guideline"],
+        phenoconversion_note=parsed["phenoconversion_note"],
+        retrieved_context_chunks=pack_context_chunks(chunks),
+        llm_model_used=model_used,
+        prompt_tokens=prompt_tokens,
+        completion_tokens=completion_tokens,
+        generation_time_ms=generation_time_ms,
+        created_at=datetime.now(timezone.utc),
+    )
+    cache_row = None
+    if llm_ok:
+        cache_row = {
+            "summary": record.summary,
+            "mechanism_explanation": record.mechanism_explanation,
+            "guideline_quote": record.guideline_quote,
+            "phenoconversion_note": record.phenoconversion_note,
+            "retrieved_context_chunks": record.retrieved_context_chunks,
+            "llm_model_used": model_used,
+        }
+    return record, cache_row
+
+
+def _record_from_cache(job: ExplainJob, cached: ExplanationCache) -> LLMExplanation:
+    return LLMExplanation(
+        id=uuid7(),
+        risk_analysis_id=job.risk_analysis_id,
+        summary=cached.summary,
+        mechanism_explanation=cached.mechanism_explanation,
+        guideline_quote=cached.guideline_quote,
+        phenoconversion_note=cached.phenoconversion_note,
+        retrieved_context_chunks=cached.retrieved_context_chunks,
+        llm_model_used=cached.llm_model_used,
+        generation_time_ms=0,
+        created_at=datetime.now(timezone.utc),
+    )
+
+
 # ---------------------------------------------------------------------------
 # Public interface
 # ---------------------------------------------------------------------------
+@dataclass
+class ExplainJob:
+    """Inputs for one drug's explanation."""
+    risk_analysis_id: uuid.UUID
+    gene: str
+    diplotype: str
+    genetic_phenotype: str
+    clinical_phenotype: str
+    drug_name: str
+    risk_label: str
+    phenoconversion_occurred: bool
+    active_inhibitor: Optional[str]
+
+
+# Unsaved record plus, for fresh generations, its explanation-cache row
+ExplainOutcome = Tuple[LLMExplanation, Optional[Dict[str, Any]]]
+
+
 class LLMExplainer:
     async def explain_and_save(
         self,
@@ -221,65 +513,92 @@ class LLMExplainer:
         phenoconversion_occurred: bool,
         active_inhibitor: Optional[str],
     ) -> LLMExplanation:
-        # Step 1 — RAG (optional; graceful no-op if ChromaDB unavailable)
-        chunks = _rag_retrieve(drug_name, clinical_phenotype, gene)
-
-        # Step 2 — Build chat messages
-        messages = _build_messages(
-            context_chunks=chunks,
+        job = ExplainJob(
+            risk_analysis_id=risk_analysis_id,
             gene=gene,
-            diplotype=diplotype or "Unknown",
-            genetic_phenotype=genetic_phenotype or "Unknown",
-            clinical_phenotype=clinical_phenotype or "Unknown",
+            diplotype=diplotype,
+            genetic_phenotype=genetic_phenotype,
+            clinical_phenotype=clinical_phenotype,
             drug_name=drug_name,
-            risk_label=risk_label or "Unknown",
+            risk_label=risk_label,
             phenoconversion_occurred=phenoconversion_occurred,
             active_inhibitor=active_inhibitor,
         )
+        records = await self.explain_and_save_many(db, [job])
+        return records[0]
 
-        # Step 3 — Call LLM via OpenAI SDK
-        raw_text = ""
-        prompt_tokens: Optional[int] = None
-        completion_tokens: Optional[int] = None
-        generation_time_ms: int = 0
+    async def explain_and_save_many(
+        self,
+        db: AsyncSession,
+        jobs: List[ExplainJob],
+    ) -> List[LLMExplanation]:
+        """
+        Explain several drugs at once: LLM calls run concurrently (at most
+        LLM_MAX_CONCURRENCY in flight, further paced by the RPM/TPM buckets),
+        and every record is written in a single transaction.
+        Returns the records in job order.
+        """
+        return await self.save_explanations(db, await self.explain_many(jobs))
+
+    async def explain_many(self, jobs: List[ExplainJob]) -> List[ExplainOutcome]:
+        """
+        The LLM half of explain_and_save_many. Needs no caller session (the
+        cache lookup uses its own), so it can run while the caller's session
+        is busy committing; pass the result to save_explanations().
+        """
+        if not jobs:
+            return []
         model_used = f"{settings.OPENAI_API_TYPE}:{_model_name()}"
 
-        t0 = time.time()
-        try:
-            client = _make_client()
-            response = await client.chat.completions.create(
-                model=_model_name(),
-                messages=messages,  # type: ignore[arg-type]
-                max_completion_tokens=800,
+        # Reuse the text generated for identical clinical inputs
+        keys = [
+            _explanation_cache_key(
+                model_used, job.drug_name, job.gene, job.diplotype or "Unknown",
+                job.genetic_phenotype or "Unknown", job.clinical_phenotype or "Unknown",
+                job.risk_label or "Unknown",
+                job.phenoconversion_occurred, job.active_inhibitor,
+            )
+            for job in jobs
+        ]
+        stmt = select(ExplanationCache).where(ExplanationCache.cache_key.in_(set(keys)))
+        async with AsyncSessionLocal() as session:
+            cached = {row.cache_key: row for row in (await session.execute(stmt)).scalars()}
+
+        sem = asyncio.Semaphore(max(1, settings.LLM_MAX_CONCURRENCY))
+
+        async def _explain(job, key):
+            hit = cached.get(key)
+            if hit is not None:
+                return _record_from_cache(job, hit), None
+            # Step 1 — RAG, only for cache misses (optional; graceful no-op
+            # if ChromaDB unavailable). The sync embedding + Chroma calls run
+            # in a worker thread, overlapped with the other jobs.
+            chunks = await asyncio.to_thread(
+                _rag_retrieve, job.drug_name, job.clinical_phenotype, job.gene
+            )
+            async with sem:
+                record, row = await _generate(job, chunks, model_used)
+            return record, ({"cache_key": key, **row} if row is not None else None)
+
+        return list(await asyncio.gather(*(_explain(job, key) for job, key in zip(jobs, keys))))
+
+    async def save_explanations(
+        self,
+        db: AsyncSession,
+        outcomes: List[ExplainOutcome],
+    ) -> List[LLMExplanation]:
+        """Persist explain_many() output in one transaction; returns the records."""
+        if not outcomes:
+            return []
+        # Step 5 — Persist everything in one transaction
+        records = [record for record, _ in outcomes]
+        db.add_all(records)
+        new_cache_rows = {row["cache_key"]: row for _, row in outcomes if row is not None}
+        if new_cache_rows:
+            await db.execute(
+                pg_insert(ExplanationCache)
+                .values(list(new_cache_rows.values()))
+                .on_conflict_do_nothing(index_elements=["cache_key"])
             )
-            generation_time_ms = int((time.time() - t0) * 1000)
-            raw_text = response.choices[0].message.content or ""
-            if response.usage:
-                prompt_tokens = response.usage.prompt_tokens
-                completion_tokens = response.usage.completion_tokens
-        except Exception as exc:
-            generation_time_ms = int((time.time() - t0) * 1000)
-            raw_text = f"LLM unavailable: {exc}"
-
-        # Step 4 — Parse sections
-        parsed = _parse_llm_response(raw_text)
-
-        # Step 5 — Persist
-        record = LLMExplanation(
-            id=uuid.uuid4(),
-            risk_analysis_id=risk_analysis_id,
-            summary=parsed["summary"] or raw_text[:500],
-            mechanism_explanation=parsed["mechanism"],
-            guideline_quote=parsed["guideline"],
-            phenoconversion_note=parsed["phenoconversion_note"],
-            retrieved_context_chunks={"chunks": chunks},
-            llm_model_used=model_used,
-            prompt_tokens=prompt_tokens,
-            completion_tokens=completion_tokens,
-            generation_time_ms=generation_time_ms,
-            created_at=datetime.now(timezone.utc),
-        )
-        db.add(record)
         await db.commit()
-        await db.refresh(record)
-        return record
+        return records
@@ -5,8 +5,10 @@ If PyPGx is not installed or a gene fails, returns a safe error dict
 so the rest of the pipeline can continue.
 """
 from __future__ import annotations
+import asyncio
 import os
 import tempfile
+from concurrent.futures import ProcessPoolExecutor
 from typing import Dict, Any
 
 SUPPORTED_GENES = [
@@ -26,18 +28,26 @@ class PGxCaller:
 
     Usage::
         caller = PGxCaller()
-        results = caller.call(vcf_path="/path/to/sample.vcf", output_dir="/tmp/pgx_out")
+        results = await caller.call(vcf_path="/path/to/sample.vcf", output_dir="/tmp/pgx_out")
         # results["CYP2D6"] → {"diplotype": "*1/*4", "phenotype": "IM", ...}
+
+    Genes are called concurrently in a shared worker-process pool; each
+    writes to its own sub-directory of output_dir.
     """
 
-    def call(self, vcf_path: str, output_dir: str | None = None) -> Dict[str, Any]:
+    async def call(self, vcf_path: str, output_dir: str | None = None) -> Dict[str, Any]:
         if output_dir is None:
             output_dir = tempfile.mkdtemp(prefix="pgx_")
 
-        results: Dict[str, Any] = {}
-        for gene in SUPPORTED_GENES:
-            results[gene] = self._call_gene(gene, vcf_path, output_dir)
-        return results
+        global _pgx_pool
+        if _pgx_pool is None:
+            _pgx_pool = ProcessPoolExecutor(max_workers=min(len(SUPPORTED_GENES), os.cpu_count() or 1))
+        loop = asyncio.get_running_loop()
+        calls = await asyncio.gather(*(
+            loop.run_in_executor(_pgx_pool, _call_gene, gene, vcf_path, output_dir)
+            for gene in SUPPORTED_GENES
+        ))
+        return dict(zip(SUPPORTED_GENES, calls))
 
     # ------------------------------------------------------------------
     def _call_gene(self, gene: str, vcf_path: str, output_dir: str) -> Dict[str, Any]:
@@ -110,3 +120,17 @@ class PGxCaller:
             "raw_output": {},
             "error": reason,
         }
+
+
+_pgx_pool: ProcessPoolExecutor | None = None
+
+
+def _call_gene(gene: str, vcf_path: str, output_dir: str) -> Dict[str, Any]:
+    return PGxCaller()._call_gene(gene, vcf_path, output_dir)
+
+
+def shutdown_pgx_pool() -> None:
+    global _pgx_pool
+    if _pgx_pool is not None:
+        _pgx_pool.shutdown(wait=False, cancel_futures=True)
+        _pgx_pool = None
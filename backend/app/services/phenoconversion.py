@@ -3,8 +3,9 @@ Phenoconversion engine — adjusts genetic activity score based on
 co-administered inhibitors/inducers from the registry table.
 """
 from __future__ import annotations
+import time
 from dataclasses import dataclass
-from typing import List, Optional
+from typing import Dict, List, Optional, Tuple
 
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
@@ -22,6 +23,38 @@ class PhenoconversionResult:
     inhibition_factor: float
 
 
+@dataclass(frozen=True, slots=True)
+class _Interaction:
+    drug_name: str
+    inhibition_factor: float
+
+
+# (gene, DRUG) → strongest registry interaction; curated reference data, so
+# it is loaded whole and refreshed after _REGISTRY_TTL_S seconds.
+_REGISTRY_TTL_S = 600.0
+_registry: Dict[Tuple[str, str], _Interaction] = {}
+_registry_loaded_at: Optional[float] = None
+
+
+async def _ensure_registry(db: AsyncSession) -> Dict[Tuple[str, str], _Interaction]:
+    global _registry, _registry_loaded_at
+    now = time.monotonic()
+    if _registry_loaded_at is None or now - _registry_loaded_at > _REGISTRY_TTL_S:
+        stmt = select(
+            InhibitorInducerRegistry.gene,
+            InhibitorInducerRegistry.drug_name,
+            InhibitorInducerRegistry.inhibition_factor,
+        )
+        registry: Dict[Tuple[str, str], _Interaction] = {}
+        for gene, drug_name, factor in (await db.execute(stmt)).all():
+            key = (gene, drug_name.upper())
+            current = registry.get(key)
+            if current is None or abs(factor - 1.0) > abs(current.inhibition_factor - 1.0):
+                registry[key] = _Interaction(drug_name, factor)
+        _registry, _registry_loaded_at = registry, now
+    return _registry
+
+
 async def apply_phenoconversion(
     gene: str,
     genetic_activity_score: float,
@@ -30,37 +63,55 @@ async def apply_phenoconversion(
 ) -> PhenoconversionResult:
     """
     Steps:
-      1. Query inhibitor_inducer_registry for each medication × gene.
+      1. Look up inhibitor_inducer_registry (cached in-process) for each
+         medication × gene.
       2. Find the most potent interaction (minimum inhibition_factor for
          inhibitors, maximum for inducers — but we take the value that
          deviates most from 1.0).
       3. clinical_activity_score = genetic_activity_score × chosen_factor
       4. Re-map to phenotype label.
     """
+    results = await apply_phenoconversion_batch(
+        {gene: genetic_activity_score}, concurrent_medications, db
+    )
+    return results[gene]
+
+
+async def apply_phenoconversion_batch(
+    gene_scores: Dict[str, float],
+    concurrent_medications: List[str],
+    db: AsyncSession,
+) -> Dict[str, PhenoconversionResult]:
+    """
+    apply_phenoconversion for several genes at once. The registry is read
+    from the in-process cache, so this only touches the database when the
+    cache is cold or expired.
+    """
     # No co-medications → identity
-    if not concurrent_medications:
-        return _no_change(gene, genetic_activity_score)
+    if not concurrent_medications or not gene_scores:
+        return {g: _no_change(g, s) for g, s in gene_scores.items()}
 
     upper_meds = [m.upper() for m in concurrent_medications]
+    registry = await _ensure_registry(db)
 
-    stmt = select(InhibitorInducerRegistry).where(
-        InhibitorInducerRegistry.gene == gene,
-        InhibitorInducerRegistry.drug_name.in_(upper_meds),
-    )
-    rows = (await db.execute(stmt)).scalars().all()
-
-    if not rows:
-        return _no_change(gene, genetic_activity_score)
+    results: Dict[str, PhenoconversionResult] = {}
+    for gene, score in gene_scores.items():
+        # Pick factor that deviates most from 1.0
+        best: Optional[_Interaction] = None
+        best_deviation = 0.0
+        for med in upper_meds:
+            hit = registry.get((gene, med))
+            if hit is not None and abs(hit.inhibition_factor - 1.0) > best_deviation:
+                best, best_deviation = hit, abs(hit.inhibition_factor - 1.0)
+        results[gene] = _convert(gene, score, best)
+    return results
 
-    # Pick factor that deviates most from 1.0
-    best_row: Optional[InhibitorInducerRegistry] = None
-    best_deviation = 0.0
-    for row in rows:
-        deviation = abs(row.inhibition_factor - 1.0)
-        if deviation > best_deviation:
-            best_deviation = deviation
-            best_row = row
 
+def _convert(
+    gene: str,
+    genetic_activity_score: float,
+    best_row: Optional[_Interaction],
+) -> PhenoconversionResult:
     if best_row is None:
         return _no_change(gene, genetic_activity_score)
 
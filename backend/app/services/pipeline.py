@@ -20,16 +20,19 @@ Pipeline order (LLM is called LAST, never influences risk logic):
   6. Return assembled result dicts
 """
 from __future__ import annotations
+import asyncio
 import uuid
+from collections import defaultdict
 import os
 from datetime import datetime, timezone
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Tuple
 
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 
+from app.database import uuid7
 from app.models.detected_variant import DetectedVariant
-from app.models.pgx_genotype_call import PGxGenotypeCall
+from app.models.pgx_genotype_call import PGxGenotypeCall, pack_raw_output
 from app.models.risk_analysis import RiskAnalysis
 from app.models.llm_explanation import LLMExplanation
 from app.models.analysis_request import AnalysisRequest
@@ -38,17 +41,22 @@ from app.models.patient import Patient
 
 from app.services.pgx_caller import PGxCaller
 from app.services.activity_score import calculate_genetic_activity_score, genetic_score_to_phenotype
-from app.services.phenoconversion import apply_phenoconversion
+from app.services.phenoconversion import PhenoconversionResult, apply_phenoconversion_batch
 from app.services.cpic_engine import lookup_cpic, DRUG_TO_GENE
 from app.services.confidence import calculate_confidence
-from app.services.llm_service import LLMExplainer
+from app.services.llm_service import ExplainJob, LLMExplainer
+
+# Stateless service objects, shared by every pipeline run
+_PGX_CALLER = PGxCaller()
+_EXPLAINER = LLMExplainer()
 
 # ── phenotype severity ordering (worst = lowest index) ──────────────────────
 _PHENOTYPE_SEVERITY = {"PM": 0, "IM": 1, "NM": 2, "RM": 3, "UM": 4, "URM": 4, "Unknown": 5}
 
-# Star alleles known to cause loss or reduced function (subset for our 6 drugs)
-_LOF_ALLELES = {"*3", "*4", "*5", "*6", "*7", "*8", "*2A", "*4A", "*4B"}
-_REDUCED_ALLELES = {"*2", "*9", "*10", "*17", "*29", "*41"}
+# Star alleles known to cause loss or reduced function (subset for our 6 drugs),
+# upper-case to match the normalized star allele
+_LOF_ALLELES = ("*3", "*4", "*5", "*6", "*7", "*8", "*2A", "*4A", "*4B")
+_REDUCED_ALLELES = ("*2", "*9", "*10", "*17", "*29", "*41")
 
 
 def _variant_impact(star_allele: Optional[str]) -> str:
@@ -57,30 +65,20 @@ def _variant_impact(star_allele: Optional[str]) -> str:
         return "normal_function"
     sa = star_allele.strip().upper()
     for lof in _LOF_ALLELES:
-        if lof.upper() in sa:
+        if lof in sa:
             return "loss_of_function"
     for red in _REDUCED_ALLELES:
-        if red.upper() in sa:
+        if red in sa:
             return "reduced_function"
     return "normal_function"
 
 
-def _worse_phenotype(a: str, b: str) -> str:
-    """Return the phenotype with lower activity (more severe)."""
-    return a if _PHENOTYPE_SEVERITY.get(a, 5) <= _PHENOTYPE_SEVERITY.get(b, 5) else b
-
-
 # ── VKORC1 check ──────────────────────────────────────────────────────────
-async def _vkorc1_note(patient_id: uuid.UUID, vcf_upload_id: uuid.UUID, db: AsyncSession) -> str:
-    stmt = select(DetectedVariant).where(
-        DetectedVariant.patient_id == patient_id,
-        DetectedVariant.vcf_upload_id == vcf_upload_id,
-        DetectedVariant.rsid == "rs9923231",
-    )
-    row = (await db.execute(stmt)).scalars().first()
+def _vkorc1_note(variants_by_rsid: Dict[str, Dict[str, Any]]) -> str:
+    row = variants_by_rsid.get("rs9923231")
     if not row:
         return ""
-    gt = row.genotype or ""
+    gt = row["genotype"] or ""
     if gt == "1/1":
         return " VKORC1 rs9923231: AA genotype (High Sensitivity) — consider starting dose 0.5-2 mg/day."
     if gt == "0/1":
@@ -130,7 +128,8 @@ async def run_analysis_pipeline(
 async def _pipeline(req: AnalysisRequest, is_pediatric: bool, is_pregnant: bool, db: AsyncSession) -> List[Dict[str, Any]]:
     patient_id = req.patient_id
     vcf_upload_id = req.vcf_upload_id
-    drugs: List[str] = req.requested_drugs or []
+    # The route stores drugs upper-cased already; normalize once regardless
+    drugs: List[str] = [d.upper() for d in req.requested_drugs or ()]
     concurrent_meds: List[str] = req.concurrent_medications or []
 
     # ── 1. Load VCF upload & patient ─────────────────────────────────────
@@ -138,29 +137,30 @@ async def _pipeline(req: AnalysisRequest, is_pediatric: bool, is_pregnant: bool,
     patient: Patient = await db.get(Patient, patient_id)
 
     # ── 2. Load detected variants ────────────────────────────────────────
-    stmt = select(DetectedVariant).where(
-        DetectedVariant.vcf_upload_id == vcf_upload_id
-    )
-    all_variants: List[DetectedVariant] = (await db.execute(stmt)).scalars().all()
-    variant_dicts = [
-        {
-            "rsid": v.rsid,
-            "gene": v.gene,
-            "chromosome": v.chromosome,
-            "position": v.position,
-            "ref_allele": v.ref_allele,
-            "alt_allele": v.alt_allele,
-            "genotype": v.genotype,
-            "star_allele": v.star_allele,
-            "quality_score": v.quality_score,
-            "filter_status": v.filter_status,
-        }
-        for v in all_variants
-    ]
+    # Column projection: plain row mappings, no ORM instances to build
+    stmt = select(
+        DetectedVariant.rsid,
+        DetectedVariant.gene,
+        DetectedVariant.chromosome,
+        DetectedVariant.position,
+        DetectedVariant.ref_allele,
+        DetectedVariant.alt_allele,
+        DetectedVariant.genotype,
+        DetectedVariant.star_allele,
+        DetectedVariant.quality_score,
+        DetectedVariant.filter_status,
+    ).where(DetectedVariant.vcf_upload_id == vcf_upload_id)
+    variant_dicts = [dict(row) for row in (await db.execute(stmt)).mappings()]
+    # Indexed once so per-drug lookups need neither scans nor queries
+    variants_by_rsid: Dict[str, Dict[str, Any]] = {}
+    variants_by_gene: Dict[str, List[Dict[str, Any]]] = defaultdict(list)
+    for v in variant_dicts:
+        variants_by_gene[v["gene"]].append(v)
+        if v["rsid"]:
+            variants_by_rsid.setdefault(v["rsid"], v)
 
     # ── 3. Run PGxCaller ─────────────────────────────────────────────────
-    caller = PGxCaller()
-    pgx_results = caller.call(vcf_path=vcf_upload.file_path)
+    pgx_results = await _PGX_CALLER.call(vcf_path=vcf_upload.file_path)
 
     # Save pgx_genotype_calls
     gene_call_map: Dict[str, PGxGenotypeCall] = {}
@@ -172,7 +172,7 @@ async def _pipeline(req: AnalysisRequest, is_pediatric: bool, is_pregnant: bool,
             pheno = genetic_score_to_phenotype(gene, gen_score)
 
         call = PGxGenotypeCall(
-            id=uuid.uuid4(),
+            id=uuid7(),
             vcf_upload_id=vcf_upload_id,
             patient_id=patient_id,
             gene=gene,
@@ -182,41 +182,49 @@ async def _pipeline(req: AnalysisRequest, is_pediatric: bool, is_pregnant: bool,
             copy_number=gdata.get("copy_number"),
             has_structural_variant=bool(gdata.get("has_structural_variant", False)),
             calling_method=gdata.get("calling_method") or "Unknown",
-            raw_pypgx_output=gdata.get("raw_output") or {},
+            raw_pypgx_output=pack_raw_output(gdata.get("raw_output")),
         )
-        db.add(call)
         gene_call_map[gene] = call
 
-    await db.commit()
-    for call in gene_call_map.values():
-        await db.refresh(call)
+    # Every field the pipeline reads is assigned client-side, so the calls
+    # are committed together with the risk rows below without a refresh.
+    db.add_all(gene_call_map.values())
 
     # ── 4. Per-drug analysis ──────────────────────────────────────────────
-    results = []
-    explainer = LLMExplainer()
+    targets = {
+        drug: _select_gene_call(drug, DRUG_TO_GENE.get(drug, "Unknown"), gene_call_map)
+        for drug in drugs
+    }
+
+    # Phenoconversion for every target gene at once (registry is cached)
+    pheno_results = await apply_phenoconversion_batch(
+        {primary_gene.split("+")[0]: gen_score for primary_gene, _, _, gen_score in targets.values()},
+        concurrent_meds,
+        db,
+    )
 
+    results = []
     for drug in drugs:
-        drug = drug.upper()
-        primary_gene = DRUG_TO_GENE.get(drug, "Unknown")
-        risk_rec = await _analyze_drug(
+        primary_gene, gene_call, diplotype, gen_score = targets[drug]
+        risk_rec = _analyze_drug(
             drug=drug,
             primary_gene=primary_gene,
-            gene_call_map=gene_call_map,
-            all_variants=variant_dicts,
-            concurrent_meds=concurrent_meds,
+            gene_call=gene_call,
+            diplotype=diplotype,
+            gen_score=gen_score,
+            pheno_result=pheno_results[primary_gene.split("+")[0]],
+            variants_by_gene=variants_by_gene,
+            variants_by_rsid=variants_by_rsid,
             is_pediatric=is_pediatric,
             is_pregnant=is_pregnant,
             patient_id=patient_id,
             vcf_upload_id=vcf_upload_id,
-            db=db,
         )
         results.append((drug, risk_rec))
 
     # ── 5. LLM explanations (after all deterministic logic) ───────────────
-    final = []
-    for drug, (risk_row, gene_call, pheno_result, cpic_result) in results:
-        llm_rec = await explainer.explain_and_save(
-            db=db,
+    jobs = [
+        ExplainJob(
             risk_analysis_id=risk_row.id,
             gene=risk_row.primary_gene or "",
             diplotype=risk_row.diplotype or "Unknown",
@@ -227,50 +235,57 @@ async def _pipeline(req: AnalysisRequest, is_pediatric: bool, is_pregnant: bool,
             phenoconversion_occurred=risk_row.phenoconversion_occurred,
             active_inhibitor=risk_row.active_inhibitor,
         )
+        for drug, (risk_row, _, _, _) in results
+    ]
+    # Risk-row ids are assigned client-side, so the LLM calls can start
+    # while genotype calls and risk rows commit (in one transaction).
+    explaining = asyncio.ensure_future(_EXPLAINER.explain_many(jobs))
+    db.add_all([risk_row for _, (risk_row, _, _, _) in results])
+    try:
+        await db.commit()
+    except BaseException:
+        explaining.cancel()
+        raise
+    llm_recs = await _EXPLAINER.save_explanations(db, await explaining)
 
-        # Build hackathon-required response schema
-        gene_variants = [v for v in variant_dicts if v.get("gene") == risk_row.primary_gene]
-        genes_called_ok = [g for g, c in gene_call_map.items() if (c.phenotype or "") != "Unknown"]
-        genes_failed = [g for g, c in gene_call_map.items() if (c.phenotype or "") == "Unknown"]
+    # Shared by every drug result
+    timestamp = datetime.now(timezone.utc).isoformat()
+    genes_called_ok = [g for g, c in gene_call_map.items() if (c.phenotype or "") != "Unknown"]
+    genes_failed = [g for g, c in gene_call_map.items() if (c.phenotype or "") == "Unknown"]
 
+    final = []
+    for (drug, (risk_row, gene_call, pheno_result, cpic_result)), llm_rec in zip(results, llm_recs):
+        # Build hackathon-required response schema
         final.append(_build_result(
             patient=patient,
             drug=drug,
             risk_row=risk_row,
             llm_rec=llm_rec,
-            gene_variants=gene_variants,
+            gene_variants=variants_by_gene.get(risk_row.primary_gene, []),
             vcf_upload=vcf_upload,
             genes_called_ok=genes_called_ok,
             genes_failed=genes_failed,
+            timestamp=timestamp,
         ))
 
     return final
 
 
 # ── drug analysis sub-routine ─────────────────────────────────────────────
-async def _analyze_drug(
+def _select_gene_call(
     drug: str,
     primary_gene: str,
     gene_call_map: Dict[str, PGxGenotypeCall],
-    all_variants: List[Dict[str, Any]],
-    concurrent_meds: List[str],
-    is_pediatric: bool,
-    is_pregnant: bool,
-    patient_id: uuid.UUID,
-    vcf_upload_id: uuid.UUID,
-    db: AsyncSession,
-):
-    now = datetime.now(timezone.utc)
-
+) -> Tuple[str, Optional[PGxGenotypeCall], str, float]:
+    """Return (primary_gene, gene_call, diplotype, genetic_activity_score) for a drug."""
     # Determine gene(s) to use
     if drug == "AZATHIOPRINE":
         tpmt_call = gene_call_map.get("TPMT")
         nudt_call = gene_call_map.get("NUDT15")
-        tpmt_pheno = getattr(tpmt_call, "phenotype", "Unknown") or "Unknown"
-        nudt_pheno = getattr(nudt_call, "phenotype", "Unknown") or "Unknown"
-        # Take the worse phenotype
-        worst = _worse_phenotype(tpmt_pheno, nudt_pheno)
-        gene_call = tpmt_call if worst == tpmt_pheno else nudt_call
+        # Take the worse phenotype (missing/blank calls rank as Unknown)
+        tpmt_rank = _PHENOTYPE_SEVERITY.get(getattr(tpmt_call, "phenotype", None), 5)
+        nudt_rank = _PHENOTYPE_SEVERITY.get(getattr(nudt_call, "phenotype", None), 5)
+        gene_call = tpmt_call if tpmt_rank <= nudt_rank else nudt_call
         primary_gene = "TPMT+NUDT15"
     else:
         gene_call = gene_call_map.get(primary_gene)
@@ -279,24 +294,35 @@ async def _analyze_drug(
     gen_score = getattr(gene_call, "genetic_activity_score", None)
     if gen_score is None:
         gen_score = calculate_genetic_activity_score(primary_gene.split("+")[0], diplotype) or 0.0
+    return primary_gene, gene_call, diplotype, gen_score
 
-    # Phenoconversion
-    pheno_result = await apply_phenoconversion(
-        gene=primary_gene.split("+")[0],
-        genetic_activity_score=gen_score,
-        concurrent_medications=concurrent_meds,
-        db=db,
-    )
+
+def _analyze_drug(
+    drug: str,
+    primary_gene: str,
+    gene_call: Optional[PGxGenotypeCall],
+    diplotype: str,
+    gen_score: float,
+    pheno_result: PhenoconversionResult,
+    variants_by_gene: Dict[str, List[Dict[str, Any]]],
+    variants_by_rsid: Dict[str, Dict[str, Any]],
+    is_pediatric: bool,
+    is_pregnant: bool,
+    patient_id: uuid.UUID,
+    vcf_upload_id: uuid.UUID,
+):
+    """Deterministic risk decision for one drug; returns the unsaved RiskAnalysis."""
+    now = datetime.now(timezone.utc)
 
     genetic_phenotype = genetic_score_to_phenotype(primary_gene.split("+")[0], gen_score)
 
     # CPIC lookup
     cpic_result = lookup_cpic(drug, pheno_result.clinical_phenotype)
-    dosing = cpic_result["dosing"]
+    dosing = cpic_result.dosing
 
     # WARFARIN VKORC1 special case
     if drug == "WARFARIN":
-        vkorc1_note = await _vkorc1_note(patient_id, vcf_upload_id, db)
+        vkorc1_note = _vkorc1_note(variants_by_rsid)
         if vkorc1_note:
             dosing += vkorc1_note
 
@@ -308,7 +334,7 @@ async def _analyze_drug(
             dosing += f"\n\n🚨 PREGNANCY ALERT: Pregnancy induces higher basal activity in {primary_gene}. Normal metabolizers may exhibit ultrarapid metabolism. Dose titration and closer monitoring are highly recommended."
 
     # Confidence score
-    gene_variants = [v for v in all_variants if v.get("gene") == primary_gene.split("+")[0]]
+    gene_variants = variants_by_gene.get(primary_gene.split("+")[0], [])
     call_dict = {
         "calling_method": getattr(gene_call, "calling_method", "Unknown"),
         "phenotype": getattr(gene_call, "phenotype", "Unknown"),
@@ -319,7 +345,7 @@ async def _analyze_drug(
 
     # Save risk_analyses row
     risk_row = RiskAnalysis(
-        id=uuid.uuid4(),
+        id=uuid7(),
         patient_id=patient_id,
         vcf_upload_id=vcf_upload_id,
         drug_name=drug,
@@ -332,20 +358,16 @@ async def _analyze_drug(
         clinical_activity_score=pheno_result.clinical_activity_score,
         clinical_phenotype=pheno_result.clinical_phenotype,
         phenoconversion_occurred=pheno_result.phenoconversion_occurred,
-        risk_label=cpic_result["risk_label"],
-        severity=cpic_result["severity"],
+        risk_label=cpic_result.risk_label,
+        severity=cpic_result.severity,
         confidence_score=conf,
         dosing_recommendation=dosing,
-        alternative_drugs=cpic_result.get("alternatives") or [],
-        cpic_guideline_version=cpic_result.get("cpic_version"),
-        cpic_evidence_level=cpic_result.get("evidence_level"),
+        alternative_drugs=list(cpic_result.alternatives),
+        cpic_guideline_version=cpic_result.cpic_version,
+        cpic_evidence_level=cpic_result.evidence_level,
         created_at=now,
         updated_at=now,
     )
-    db.add(risk_row)
-    await db.commit()
-    await db.refresh(risk_row)
-
     return risk_row, gene_call, pheno_result, cpic_result
 
 
@@ -359,6 +381,7 @@ def _build_result(
     vcf_upload: VCFUpload,
     genes_called_ok: List[str],
     genes_failed: List[str],
+    timestamp: str,
 ) -> Dict[str, Any]:
     phenoconv_note = (
         f"Patient is genotypically {risk_row.genetic_phenotype} but phenotypically "
@@ -374,7 +397,7 @@ def _build_result(
     return {
         "patient_id": patient.patient_code,
         "drug": drug,
-        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "timestamp": timestamp,
         "risk_assessment": {
             "risk_label": risk_row.risk_label,
             "confidence_score": risk_row.confidence_score,
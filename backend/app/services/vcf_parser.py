@@ -1,9 +1,15 @@
 """VCF file parser — no external dependencies, pure Python."""
 from __future__ import annotations
+import asyncio
+import os
+from concurrent.futures import ProcessPoolExecutor
 from dataclasses import dataclass, field
 from typing import List, Dict, Any
 
 
+_FIXED_COLS = ("CHROM", "POS", "ID", "REF", "ALT", "QUAL", "FILTER", "INFO", "FORMAT")
+
+
 @dataclass
 class VCFParseResult:
     success: bool
@@ -35,6 +41,11 @@ class VCFParser:
         header_cols: List[str] = []
         variants: List[Dict[str, Any]] = []
         at_least_one_gene_tag = False
+        # Hot-loop locals: skip attribute lookups on every row
+        parse_info = self._parse_info
+        safe_int = self._safe_int
+        append = variants.append
+        gt_pos_by_format: Dict[str, int | None] = {}  # FORMAT string → GT position
 
         with open(file_path, "r", encoding="utf-8", errors="replace") as fh:
             for raw_line in fh:
@@ -49,19 +60,29 @@ class VCFParser:
                 # ── column header line ───────────────────────────────────
                 if line.startswith("#CHROM"):
                     header_cols = line.lstrip("#").split("\t")
+                    ncols = len(header_cols)
+                    col_index = {name: i for i, name in enumerate(header_cols)}
+                    # Absent columns point at the blank slot appended to each row
+                    (chrom_i, pos_i, id_i, ref_i, alt_i, qual_i,
+                     filter_i, info_i, format_i) = (col_index.get(c, ncols) for c in _FIXED_COLS)
+                    sample_i = 9 if ncols > 9 else None  # first sample column
                     continue
 
                 # ── data lines ───────────────────────────────────────────
                 if not header_cols:
                     continue  # no header yet — skip
 
-                parts = line.split("\t")
-                if len(parts) < 8:
+                # Columns past the header are never read, so stop splitting there
+                parts = line.split("\t", ncols)
+                n = len(parts)
+                if n < 8:
                     continue
+                if n <= ncols:
+                    parts.extend([""] * (ncols + 1 - n))
+                else:
+                    parts[ncols] = ""
 
-                row = dict(zip(header_cols, parts))
-                info_str = row.get("INFO", "")
-                info = self._parse_info(info_str)
+                info = parse_info(parts[info_i])
 
                 gene = info.get("GENE")
                 star = info.get("STAR")
@@ -71,33 +92,36 @@ class VCFParser:
 
                 # Extract FORMAT/SAMPLE genotype
                 genotype = None
-                format_keys = row.get("FORMAT", "").split(":")
-                sample_key = None
-                for k in header_cols[9:]:  # first sample column
-                    sample_key = k
-                    break
-                if sample_key and sample_key in row:
-                    sample_vals = row[sample_key].split(":")
-                    sample_map = dict(zip(format_keys, sample_vals))
-                    genotype = sample_map.get("GT")
+                if sample_i is not None and sample_i < n:
+                    fmt = parts[format_i]
+                    try:
+                        gt_i = gt_pos_by_format[fmt]
+                    except KeyError:
+                        format_keys = fmt.split(":")
+                        gt_i = format_keys.index("GT") if "GT" in format_keys else None
+                        gt_pos_by_format[fmt] = gt_i
+                    if gt_i is not None:
+                        sample_vals = parts[sample_i].split(":", gt_i + 1)
+                        if gt_i < len(sample_vals):
+                            genotype = sample_vals[gt_i]
 
                 # QUAL
-                qual_raw = row.get("QUAL", ".")
+                qual_raw = parts[qual_i]
                 quality_score = None
                 try:
                     quality_score = float(qual_raw) if qual_raw != "." else None
                 except ValueError:
                     pass
 
-                variants.append(
+                append(
                     {
-                        "rsid": row.get("ID", ".").strip() or None,
-                        "chromosome": row.get("CHROM", "").lstrip("chr"),
-                        "position": self._safe_int(row.get("POS")),
-                        "ref_allele": row.get("REF", ""),
-                        "alt_allele": row.get("ALT", ""),
+                        "rsid": parts[id_i].strip() or None,
+                        "chromosome": parts[chrom_i].lstrip("chr"),
+                        "position": safe_int(parts[pos_i]),
+                        "ref_allele": parts[ref_i],
+                        "alt_allele": parts[alt_i],
                         "quality_score": quality_score,
-                        "filter_status": row.get("FILTER", ".") or ".",
+                        "filter_status": parts[filter_i] or ".",
                         "gene": gene,
                         "star_allele": star,
                         "genotype": genotype,
@@ -133,12 +157,11 @@ class VCFParser:
     def _parse_info(info_str: str) -> Dict[str, str]:
         """Parse semicolon-delimited KEY=VALUE pairs from INFO field."""
         result: Dict[str, str] = {}
+        # One partition per token; whitespace is tolerated around keys and
+        # values since hand-edited VCFs often contain it
         for token in info_str.split(";"):
-            if "=" in token:
-                k, _, v = token.partition("=")
-                result[k.strip()] = v.strip()
-            else:
-                result[token.strip()] = "true"
+            k, sep, v = token.partition("=")
+            result[k.strip()] = v.strip() if sep else "true"
         return result
 
     @staticmethod
@@ -147,3 +170,29 @@ class VCFParser:
             return int(val) if val else None
         except (ValueError, TypeError):
             return None
+
+
+# ---------------------------------------------------------------------------
+# Worker-process parsing (keeps the CPU-bound loop off the event loop / GIL)
+# ---------------------------------------------------------------------------
+_parse_pool: ProcessPoolExecutor | None = None
+
+
+def _parse_file(file_path: str) -> VCFParseResult:
+    return VCFParser().parse(file_path)
+
+
+async def parse_vcf_async(file_path: str) -> VCFParseResult:
+    """Run VCFParser.parse in the shared worker-process pool."""
+    global _parse_pool
+    if _parse_pool is None:
+        _parse_pool = ProcessPoolExecutor(max_workers=os.cpu_count())
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_parse_pool, _parse_file, file_path)
+
+
+def shutdown_parse_pool() -> None:
+    global _parse_pool
+    if _parse_pool is not None:
+        _parse_pool.shutdown(wait=False, cancel_futures=True)
+        _parse_pool = None
@@ -5,6 +5,7 @@ Primary color: #1E3A8A
 
 Routes:
   POST /api/v1/analyze   → Upload VCF + run full pipeline → return results
+  POST /api/v1/upload    → Upload + parse VCF, persist variants only
   GET  /api/v1/results/{patient_id} → Fetch results by patient ID or code
   GET  /api/v1/supported-drugs      → List supported drugs
   GET  /api/v1/health               → Health check
@@ -14,10 +15,10 @@ import logging
 
 from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, ORJSONResponse
 
 from app.database import init_db
-from app.routers import analyze, results, meta
+from app.routers import analyze, results, meta, upload
 
 logger = logging.getLogger(__name__)
 
@@ -27,6 +28,7 @@ app = FastAPI(
     version="1.0.0",
     docs_url="/docs",
     redoc_url="/redoc",
+    default_response_class=ORJSONResponse,
 )
 
 # ── CORS ─────────────────────────────────────────────────────────────────────
@@ -57,13 +59,25 @@ async def on_startup():
     asyncio.create_task(_run_cpic_ingestion())
 
 
+@app.on_event("shutdown")
+async def on_shutdown():
+    from app.services.llm_service import close_client
+    from app.services.pgx_caller import shutdown_pgx_pool
+    from app.services.vcf_parser import shutdown_parse_pool
+    shutdown_parse_pool()
+    shutdown_pgx_pool()
+    await close_client()
+
+
 async def _run_cpic_ingestion():
     """
-    Background task: fetch CPIC data from the live API, embed it, and
-    upsert into ChromaDB.  Errors are logged but never crash the server.
+    Background task: warm up the embedding/ChromaDB clients, then fetch
+    CPIC data from the live API, embed it, and upsert into ChromaDB.
+    Errors are logged but never crash the server.
     """
     try:
-        from app.services.cpic_ingestion import ingest_cpic_guidelines
+        from app.services.cpic_ingestion import ingest_cpic_guidelines, warmup
+        await warmup()
         await ingest_cpic_guidelines()
     except Exception as exc:
         logger.error("CPIC RAG ingestion failed (non-fatal): %s", exc)
@@ -73,6 +87,7 @@ async def _run_cpic_ingestion():
 PREFIX = "/api/v1"
 
 app.include_router(analyze.router, prefix=PREFIX, tags=["Analyze"])
+app.include_router(upload.router, prefix=PREFIX, tags=["Upload"])
 app.include_router(results.router, prefix=PREFIX, tags=["Results"])
 app.include_router(meta.router, prefix=PREFIX, tags=["Meta"])
 
@@ -88,6 +103,7 @@ async def root():
             "docs": "/docs",
             "routes": {
                 "analyze": "POST /api/v1/analyze  (multipart/form-data: vcf_file, patient_code, drugs, concurrent_medications)",
+                "upload": "POST /api/v1/upload  (multipart/form-data: vcf_file, patient_code)",
                 "results": "GET  /api/v1/results/{patient_id}",
                 "supported_drugs": "GET /api/v1/supported-drugs",
                 "health": "GET /api/v1/health",